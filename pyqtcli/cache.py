@@ -0,0 +1,242 @@
+"""Module caching generated rc files to avoid running pyrcc5 needlessly."""
+
+import os
+import json
+import shutil
+import hashlib
+import itertools
+import subprocess
+
+from lxml import etree
+
+from pyqtcli.qrc import read_qrc_index
+from pyqtcli.exception import QRCFileError
+
+
+class BuildCache:
+    """Cache of rc files identified by a hash of everything they depend on.
+
+    The key of a rc file is computed from the tool generating it, usually
+    the pyrcc5 version, the content of the qrc file and the path, size and
+    modification time of each resource it references. Cached rc files are
+    evicted, least recently used first, when the cache grows over its
+    maximal size.
+
+    Attributes:
+        directory (str): Path to the cache directory.
+        max_size (int): Maximal size of cached files in bytes.
+        hash_content (bool): If True, the content of resources is hashed in
+            addition to their size and modification time.
+
+    """
+
+    CACHE_DIR = ".pyqtclicache"
+    MAX_SIZE = 256 * 1024 * 1024
+    VERSION_FILE = "pyrcc5-version.json"
+    CHUNK_SIZE = 1024 * 1024
+
+    def __init__(self, directory, max_size=MAX_SIZE, hash_content=False):
+        self.directory = directory
+        self.max_size = max_size
+        self.hash_content = hash_content
+        self._pyrcc5_version = None
+
+    @classmethod
+    def for_project(cls, project, **kwargs):
+        """Return the cache located in the directory of a project.
+
+        Args:
+            project (:class:`pyqtcli.config.ProjectContext`): Project paths.
+
+        Returns:
+            :class:`BuildCache`: Cache of the project.
+
+        """
+        return cls(os.path.join(project.root_path, cls.CACHE_DIR), **kwargs)
+
+    def pyrcc5_version(self):
+        """Return the version of pyrcc5 tool.
+
+        The version is recorded in the cache directory with the size and
+        modification time of pyrcc5 executable so that pyrcc5 is only
+        launched when it changes.
+
+        Returns:
+            str: Version of pyrcc5 or None if pyrcc5 can't be found.
+
+        """
+        if self._pyrcc5_version is not None:
+            return self._pyrcc5_version
+
+        executable = shutil.which("pyrcc5")
+        if executable is None:
+            return None
+
+        st = os.stat(executable)
+        stamp = [executable, st.st_size, st.st_mtime_ns]
+        version_file = os.path.join(self.directory, self.VERSION_FILE)
+
+        try:
+            with open(version_file, "r") as f:
+                recorded = json.load(f)
+            if recorded["executable"] == stamp:
+                self._pyrcc5_version = recorded["version"]
+                return self._pyrcc5_version
+        except (OSError, ValueError, KeyError):
+            pass
+
+        # pyrcc5 prints its version and exits with an error code
+        result = subprocess.run([executable, "-version"],
+                                stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+        version = (result.stdout + result.stderr).decode("utf-8").strip()
+
+        os.makedirs(self.directory, exist_ok=True)
+        with open(version_file, "w") as f:
+            json.dump({"executable": stamp, "version": version}, f)
+
+        self._pyrcc5_version = version
+        return version
+
+    def key(self, qrc_file, compiler=None):
+        """Compute the key identifying the rc file generated from a qrc file.
+
+        Args:
+            qrc_file (str): Path to the qrc file.
+            compiler (Optional[str]): Identifier of the tool generating the rc
+                file. Defaults to the version of pyrcc5.
+
+        Returns:
+            str: Hexadecimal key or None if the qrc file can't be cached,
+                e.g. when it is invalid or references missing resources.
+
+        """
+        version = compiler or self.pyrcc5_version()
+        if version is None:
+            return None
+
+        try:
+            index = read_qrc_index(qrc_file)
+            with open(qrc_file, "rb") as f:
+                content = f.read()
+        except (QRCFileError, etree.XMLSyntaxError, OSError):
+            return None
+
+        key = hashlib.sha256()
+        key.update(version.encode("utf-8"))
+        key.update(content)
+
+        dir_path = os.path.dirname(os.path.abspath(qrc_file))
+        for resource, _ in itertools.chain.from_iterable(index.values()):
+            if resource is None:
+                return None
+
+            path = os.path.join(dir_path, resource)
+            try:
+                st = os.stat(path)
+            except OSError:
+                return None
+
+            # Directories are expanded by pyrcc5
+            if not os.path.isfile(path):
+                return None
+
+            key.update("\0{}\0{}\0{}".format(
+                path, st.st_size, st.st_mtime_ns).encode("utf-8"))
+
+            if self.hash_content:
+                key.update(self._hash_file(path))
+
+        return key.hexdigest()
+
+    def _hash_file(self, path):
+        """Return the digest of a file content."""
+        digest = hashlib.sha256()
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(self.CHUNK_SIZE), b""):
+                digest.update(chunk)
+
+        return digest.digest()
+
+    def _entry(self, key):
+        return os.path.join(self.directory, key + ".py")
+
+    def restore(self, key, rc_file):
+        """Restore a cached rc file.
+
+        The rc file isn't rewritten if it is identical to the cached one.
+
+        Args:
+            key (str): Key of the rc file.
+            rc_file (str): Path where restore the rc file.
+
+        Returns:
+            bool: True if the rc file was found in the cache.
+
+        """
+        entry = self._entry(key)
+        try:
+            # Mark entry as recently used
+            os.utime(entry)
+        except OSError:
+            return False
+
+        if not _same_content(entry, rc_file):
+            tmp_file = "{}.{}.tmp".format(rc_file, os.getpid())
+            shutil.copyfile(entry, tmp_file)
+            os.replace(tmp_file, rc_file)
+
+        return True
+
+    def store(self, key, rc_file):
+        """Store a generated rc file in the cache.
+
+        Args:
+            key (str): Key of the rc file.
+            rc_file (str): Path to the generated rc file.
+
+        """
+        os.makedirs(self.directory, exist_ok=True)
+
+        entry = self._entry(key)
+        tmp_file = "{}.{}.tmp".format(entry, os.getpid())
+        shutil.copyfile(rc_file, tmp_file)
+        os.replace(tmp_file, entry)
+
+    def evict(self):
+        """Remove least recently used rc files exceeding cache maximal size."""
+        try:
+            entries = [e for e in os.scandir(self.directory)
+                       if e.name.endswith(".py")]
+        except OSError:
+            return
+
+        stats = [(e.stat().st_mtime_ns, e.stat().st_size, e.path)
+                 for e in entries]
+        total = sum(size for mtime, size, path in stats)
+
+        for mtime, size, path in sorted(stats):
+            if total <= self.max_size:
+                break
+
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
+
+
+def _same_content(path, other):
+    """Check if two files have the same content, comparing sizes first."""
+    try:
+        if os.path.getsize(path) != os.path.getsize(other):
+            return False
+    except OSError:
+        return False
+
+    with open(path, "rb") as f, open(other, "rb") as o:
+        while True:
+            chunk = f.read(BuildCache.CHUNK_SIZE)
+            if chunk != o.read(BuildCache.CHUNK_SIZE):
+                return False
+            if not chunk:
+                return True
@@ -3,28 +3,88 @@
 import os
 import click
 
+from functools import update_wrapper
+
 from pyqtcli import __version__
 from pyqtcli.qrc import QRCFile
 from pyqtcli.qrc import read_qrc
 from pyqtcli.qrc import generate_qrc
 from pyqtcli.qrc import fill_qresource
 from pyqtcli.config import PyqtcliConfig
+from pyqtcli.config import ProjectContext
+from pyqtcli.utils import IgnoreRules
 from pyqtcli.utils import recursive_file_search
+from pyqtcli.utils import unique_paths
+from pyqtcli.lock import ProjectLock
+from pyqtcli.exception import PyqtcliLockError
 from pyqtcli.exception import PyqtcliConfigError
 from pyqtcli.makealias import write_alias
+from pyqtcli.makealias import COLLISION_STRATEGIES
 from pyqtcli.update import update_project
+from pyqtcli.makerc import BACKENDS
+from pyqtcli.makerc import RC_FORMATS
 from pyqtcli.makerc import generate_rc
+from pyqtcli.makerc import is_up_to_date
+from pyqtcli.cache import BuildCache
 from pyqtcli.qrc import get_prefix
 from pyqtcli import verbose as v
 
-pass_config = click.make_pass_decorator(PyqtcliConfig, ensure=True)
+# Key of the lock timeout in click context meta data
+LOCK_TIMEOUT = "pyqtcli.lock_timeout"
+
+
+def lock_project(exclusive=True):
+    """Run a command while holding the lock of the project.
+
+    Args:
+        exclusive (Optional[bool]): If False, the lock is shared with other
+            commands only reading the project.
+
+    """
+    def decorator(f):
+        @click.pass_context
+        def new_func(ctx, *args, **kwargs):
+            lock = ProjectLock.for_project(ProjectContext.find(),
+                                           ctx.meta.get(LOCK_TIMEOUT))
+            try:
+                lock.acquire(exclusive)
+            except PyqtcliLockError as e:
+                v.error(str(e))
+                raise click.Abort()
+
+            try:
+                return ctx.invoke(f, *args, **kwargs)
+            finally:
+                lock.release()
+        return update_wrapper(new_func, f)
+    return decorator
+
+
+def pass_config(f):
+    """Pass the project config to a command running in a transaction of it.
+
+    Modifications of the config file made by the command are written once,
+    at its end, and discarded if the command fails.
+
+    """
+    @click.pass_context
+    def new_func(ctx, *args, **kwargs):
+        config = ctx.ensure_object(PyqtcliConfig)
+        with config.transaction():
+            return ctx.invoke(f, config, *args, **kwargs)
+    return update_wrapper(new_func, f)
 
 
 @click.group()
 @click.version_option(version=__version__)
-def pyqtcli():
+@click.option("--lock-timeout", type=float,
+              envvar="PYQTCLI_LOCK_TIMEOUT",
+              help="Seconds to wait for other pyqtcli processes to release "
+                   "the project. Defaults to waiting as long as needed.")
+@click.pass_context
+def pyqtcli(ctx, lock_timeout):
     """A command line tool to help in managing PyQt5 project."""
-    pass
+    ctx.meta[LOCK_TIMEOUT] = lock_timeout
 
 
 @pyqtcli.group()
@@ -36,10 +96,14 @@ def new():
 @new.command("qrc", short_help="Generate a new qrc file")
 @click.option("-v", "--verbose", is_flag=True, help="Explain the process")
 @click.argument("path", default="res.qrc", type=click.Path(writable=True))
+@click.option("--scan-workers", type=click.IntRange(min=1), default=1,
+              help="Number of threads scanning directories of the folder of "
+                   "resources.")
 @click.argument("res_folder", type=click.Path(exists=True, file_okay=False),
                 nargs=1, required=False)
+@lock_project()
 @pass_config
-def qrc(config, path, res_folder, verbose):
+def qrc(config, path, res_folder, scan_workers, verbose):
     """Create a new qrc file.
 
     Args:
@@ -47,12 +111,13 @@ def qrc(config, path, res_folder, verbose):
             project config file.
         path (str): Path where create the new qrc file.
         res_folder (str): Path to the folder of resources .
+        scan_workers (int): Number of threads scanning `res_folder`.
         verbose (bool): Boolean determining if messages will be displayed.
 
     """
     file_path, name = os.path.split(path)
 
-    qrc_file = QRCFile(name, file_path)
+    qrc_file = QRCFile(name, file_path, config.sort_resources)
 
     # Verify qrc file doesn't already exists
     if name in config.get_qrcs():
@@ -64,7 +129,7 @@ def qrc(config, path, res_folder, verbose):
     config.cparser.set(name, "path", qrc_file.path)
 
     if res_folder:
-        generate_qrc(qrc_file, res_folder, build=False)
+        generate_qrc(qrc_file, res_folder, build=False, workers=scan_workers)
 
         # Get the relative path to the folder of resources from project
         # directory to add its sub dirs to the dirs variable in the
@@ -120,11 +185,15 @@ def init(quiet, yes):
 @click.option("-a", "--alias", is_flag=True,
               help="Create aliases for <file> elements")
 @click.option("-v", "--verbose", is_flag=True, help="Explain the process")
+@click.option("--scan-workers", type=click.IntRange(min=1), default=1,
+              help="Number of threads scanning directories of each folder of "
+                   "resources.")
 @click.argument("qrc_path", type=click.Path(exists=True, dir_okay=False))
 @click.argument("res_folders", nargs=-1,
                 type=click.Path(exists=True, file_okay=False))
+@lock_project()
 @pass_config
-def addqres(config, qrc_path, res_folders, alias, verbose):
+def addqres(config, qrc_path, res_folders, alias, scan_workers, verbose):
     """
     Add <qresource> element with a prefix attribute set to the base name of
     the given folder of resources. All resources contained in this folder are
@@ -138,9 +207,10 @@ def addqres(config, qrc_path, res_folders, alias, verbose):
         res_folders (tuple): Paths to folders of resources to record.
         alias (bool): If True, aliases will be generated while resources are
             recorded.
+        scan_workers (int): Number of threads scanning each folder.
         verbose (bool): Boolean determining if messages will be displayed.
     """
-    qrc_file = read_qrc(qrc_path)
+    qrc_file = read_qrc(qrc_path, config.sort_resources)
     recorded_dirs = config.get_dirs(qrc_file.name)
 
     # Remove duplication in res_folders with a set
@@ -167,7 +237,8 @@ def addqres(config, qrc_path, res_folders, alias, verbose):
         # Add qresource to qrc file
         prefix = get_prefix(folder)
         qrc_file.add_qresource(prefix)
-        fill_qresource(qrc_file, folder, prefix)
+        fill_qresource(qrc_file, folder, prefix, config.project,
+                       scan_workers)
 
         v.info("qresource with prefix: \'{}\' has been recorded in {}.".format(
                 prefix, qrc_path), verbose)
@@ -184,6 +255,7 @@ def addqres(config, qrc_path, res_folders, alias, verbose):
 @click.argument("qrc_path", type=click.Path(exists=True, dir_okay=False))
 @click.argument("res_folders", nargs=-1,
                 type=click.Path(exists=True, file_okay=False))
+@lock_project()
 @pass_config
 def rmqres(config, qrc_path, res_folders, verbose):
     """
@@ -228,43 +300,80 @@ def rmqres(config, qrc_path, res_folders, verbose):
 @click.option("-v", "--verbose", is_flag=True, help="Explain the process")
 @click.option("-r", "--recursive", is_flag=True,
               help="Search recursively for qrc files to process")
+@click.option("--collisions", type=click.Choice(COLLISION_STRATEGIES),
+              default="skip",
+              help="Alias of resources sharing a name with another one: "
+                   "none, qualified with parent directories or suffixed "
+                   "with a hash of their path.")
+@click.option("-j", "--jobs", type=click.IntRange(min=1),
+              help="Number of qrc files processed in parallel. "
+                   "Defaults to the number of CPUs.")
 @click.argument('qrc_files', nargs=-1,
                 type=click.Path(exists=True, dir_okay=False))
-def makealias(qrc_files, recursive, verbose):
+@lock_project()
+def makealias(qrc_files, recursive, collisions, jobs, verbose):
     """Command to generate aliases for each resources contained in qrc files.
 
     Args:
         qrc_files (tuple): Paths to qrc files that need to generate alias.
         recursive (bool): If True, search recursively qrc filed from launching
             directory.
+        collisions (str): Strategy giving an alias to resources whose name is
+            already an alias.
+        jobs (int): Number of qrc files processed in parallel.
         verbose (bool): Boolean determining if messages will be displayed.
 
     """
+    files = []
+
     # Check all qrc files recursively
     if recursive:
-        recursive_qrc_files = recursive_file_search("qrc")
+        ignore = IgnoreRules.for_project(ProjectContext.find())
+        recursive_qrc_files = recursive_file_search("qrc", ignore=ignore)
 
         # Check if recursive option find qrc files
         if not recursive_qrc_files:
             v.error("Could not find any qrc files.")
             raise click.Abort()
         else:
-            write_alias(recursive_qrc_files, verbose)
+            files.extend(recursive_qrc_files)
 
     # Process given files or warns user if none
     if qrc_files:
-        write_alias(qrc_files, verbose)
+        files.extend(qrc_files)
     elif not recursive:
         v.warning("No qrc files was given to process.")
+        return
+
+    files = unique_paths(files)
+    rewritten = write_alias(files, verbose, collisions, jobs)
+    v.info("{} qrc files rewritten, {} unchanged.".format(
+        len(rewritten), len(files) - len(rewritten)))
 
 
 @pyqtcli.command("makerc", short_help="Generate python qrc module to given qrc")
 @click.option("-v", "--verbose", is_flag=True, help="Explain the process")
 @click.option("-r", "--recursive", is_flag=True,
               help="Search recursively for qrc files to process.")
+@click.option("-j", "--jobs", type=click.IntRange(min=1),
+              help="Number of pyrcc5 processes run in parallel. "
+                   "Defaults to the number of CPUs.")
+@click.option("--no-cache", is_flag=True,
+              help="Always run pyrcc5 instead of reusing cached rc files.")
+@click.option("--backend", type=click.Choice(BACKENDS), default="pyrcc5",
+              help="Tool generating rc files: pyrcc5 or the native compiler.")
+@click.option("--format", "rc_format", type=click.Choice(RC_FORMATS),
+              default="python",
+              help="Embed resources in python modules or write them to "
+                   "binary rcc files loaded by the modules.")
+@click.option("--split-by-prefix", "split", is_flag=True,
+              help="Generate one rc file per qresource prefix and an index "
+                   "module loading them on demand.")
 @click.argument('qrc_files', nargs=-1,
                 type=click.Path(exists=True, dir_okay=False))
-def makerc(qrc_files, recursive, verbose):
+@lock_project(exclusive=False)
+def makerc(qrc_files, recursive, jobs, no_cache, backend, rc_format, split,
+           verbose):
     """Generate python module for corresponding given qrc files.
 
     Args:
@@ -272,22 +381,34 @@ def makerc(qrc_files, recursive, verbose):
             corresponding rc files.
         recursive (bool): If True, search recursively qrc filed from launching
             directory.
+        jobs (int): Number of pyrcc5 processes run in parallel.
+        no_cache (bool): If True, rc files are not looked up in the build
+            cache of the project.
+        backend (str): Tool generating rc files, "pyrcc5" or "native".
+        rc_format (str): Format of generated resources, "python" or "rcc".
+        split (bool): If True, rc files are generated per qresource prefix.
         verbose (bool): Boolean determining if messages will be displayed.
 
     """
+    project = ProjectContext.find()
+    cache = None if no_cache else BuildCache.for_project(project)
+
     # Check all qrc files recursively
     if recursive:
-        recursive_qrc_files = recursive_file_search("qrc")
+        ignore = IgnoreRules.for_project(project)
+        recursive_qrc_files = recursive_file_search("qrc", ignore=ignore)
 
         # Check if recursive option find qrc files
         if not recursive_qrc_files:
             v.error("Could not find any qrc files")
         else:
-            generate_rc(recursive_qrc_files, verbose)
+            generate_rc(recursive_qrc_files, verbose, jobs, cache, backend,
+                        rc_format, split)
 
     # Process given files or warns user if none
     if qrc_files:
-        generate_rc(qrc_files, verbose)
+        generate_rc(qrc_files, verbose, jobs, cache, backend, rc_format,
+                    split)
     elif not recursive:
         v.warning("No qrc files was given to process.")
 
@@ -295,10 +416,21 @@ def makerc(qrc_files, recursive, verbose):
 @pyqtcli.command("update", short_help="Update project's qrc files")
 @click.option("-v", "--verbose", is_flag=True, help="Explain the process")
 @click.option("-p", "--project", is_flag=True, help="update all project's qrcs")
+@click.option("-j", "--jobs", type=click.IntRange(min=1),
+              help="Number of pyrcc5 processes run in parallel. "
+                   "Defaults to the number of CPUs.")
+@click.option("--no-cache", is_flag=True,
+              help="Always run pyrcc5 instead of reusing cached rc files.")
+@click.option("--backend", type=click.Choice(BACKENDS), default="pyrcc5",
+              help="Tool generating rc files: pyrcc5 or the native compiler.")
+@click.option("-n", "--dry-run", is_flag=True,
+              help="Display changes of qrc files without applying them.")
 @click.argument('qrc_files', nargs=-1,
                 type=click.Path(exists=True, dir_okay=False))
+@lock_project()
 @pass_config
-def update(config, qrc_files, project, verbose):
+def update(config, qrc_files, project, jobs, no_cache, backend, dry_run,
+           verbose):
     """Update project's qrc files through information stored in config file.
 
     Args:
@@ -306,17 +438,29 @@ def update(config, qrc_files, project, verbose):
             project config file.
         qrc_files (tuple): Paths to qrc files that need to get updated.
         project (bool): If True, all registered qrc files will be updated.
+        jobs (int): Number of pyrcc5 processes run in parallel.
+        no_cache (bool): If True, rc files are not looked up in the build
+            cache of the project.
+        backend (str): Tool generating rc files, "pyrcc5" or "native".
+        dry_run (bool): If True, changes are displayed and neither qrc nor rc
+            files are written.
         verbose (bool): Boolean determining if messages will be displayed.
 
     """
+    cache = None if no_cache else BuildCache.for_project(config.project)
+
     if project:
-        recursive_qrc_files = recursive_file_search("qrc")
-        update_project(recursive_qrc_files, config, verbose)
-        generate_rc(recursive_qrc_files, verbose)
+        ignore = IgnoreRules.for_project(config.project)
+        qrc_files = recursive_file_search("qrc", ignore=ignore)
+    elif not qrc_files:
+        v.warning("No qrc files to update")
+        return
 
-    elif qrc_files:
-        update_project(qrc_files, config, verbose)
-        generate_rc(qrc_files, verbose)
+    modified = update_project(qrc_files, config, verbose, dry_run)
+    if dry_run:
+        return
 
-    else:
-        v.warning("No qrc files to update")
+    # Unmodified qrc files only need their rc file if resources changed
+    outdated = [qrc_file for qrc_file in qrc_files
+                if qrc_file in modified or not is_up_to_date(qrc_file)]
+    generate_rc(outdated, verbose, jobs, cache, backend)
@@ -1,8 +1,11 @@
 """Module regrouping classes and functions to manage configuration files."""
 
 import os
+import time
 import configparser
 
+from contextlib import contextmanager
+
 from pyqtcli import verbose as v
 from pyqtcli.exception import PyqtcliConfigError
 
@@ -25,6 +28,34 @@ def find_project_config():
         cwd = "../" + cwd
 
 
+class ProjectContext:
+    """Paths of a pyqtcli project resolved once for a whole cli invocation.
+
+    Attributes:
+        config_path (str): Absolute path to the .pyqtclirc file.
+        root_path (str): Absolute path to the project directory.
+
+    """
+
+    def __init__(self, config_path):
+        self.config_path = os.path.abspath(config_path)
+        self.root_path = os.path.dirname(self.config_path)
+
+    @classmethod
+    def find(cls):
+        """Search the project containing the current directory.
+
+        Returns:
+            :class:`ProjectContext`: Context of the .pyqtclirc found in the
+                current directory or higher, or of a new one in the current
+                directory if none is found.
+
+        """
+        config_path = find_project_config()
+        return cls(config_path or os.path.join(os.getcwd(),
+                                               PyqtcliConfig.INI_FILE))
+
+
 class PyqtcliConfig:
     """Class to modify and read config file of pyqtcli tool.
 
@@ -35,21 +66,37 @@ class PyqtcliConfig:
         verbose (Optional[bool]): A boolean to determine if a message is
             displayed at the config file generation.
         dir_path (str): Absolute path to config file directory.
+        project (:class:`ProjectContext`): Paths of the project.
         cparser (:class:`configparser.ConfigParser`): Ini file parser.
+        _stamp (tuple): Modification time and size of the config file when
+            it was last parsed, None if it must be parsed again.
+        _dirs (dict): Raw value of the dirs key and its parsed list of
+            directories for each qrc section.
+        _dirty (bool): True if directories were modified and not written in
+            the config file yet.
+        _depth (int): Number of nested transactions in progress.
 
     """
 
     INI_FILE = ".pyqtclirc"
 
-    def __init__(self, path=None, msg="", verbose=True):
+    # Files modified less than this many seconds before being parsed can be
+    # modified again without any change of their stamp
+    RACY_DELAY = 2
+
+    def __init__(self, path=None, msg="", verbose=True, project=None):
         self.cparser = configparser.ConfigParser()
         self.dir_path = os.getcwd()
+        self._stamp = None
+        self._dirs = {}
+        self._dirty = False
+        self._depth = 0
 
         if path:
-            self.path = os.path.abspath(path)
+            self.project = ProjectContext(path)
         else:
-            found_config = find_project_config()
-            self.path = found_config or os.path.join(os.getcwd(), self.INI_FILE)
+            self.project = project or ProjectContext.find()
+        self.path = self.project.config_path
 
         # Create a new ini file if not exist
         if not os.path.isfile(self.path):
@@ -71,8 +118,38 @@ class PyqtcliConfig:
         self.save()
 
     def read(self):
-        """Read the config file."""
+        """Read the config file if it changed since it was last read.
+
+        Pending modifications are kept over the content of the file.
+
+        """
+        if self._dirty:
+            return
+
+        try:
+            st = os.stat(self.path)
+        except OSError:
+            self.invalidate()
+            return
+
+        stamp = (st.st_mtime_ns, st.st_size)
+        if stamp == self._stamp:
+            return
+
         self.cparser.read(self.path)
+        self._dirs.clear()
+
+        # Don't trust the stamp of a file that could still be modified within
+        # the resolution of its modification time
+        if st.st_mtime < time.time() - self.RACY_DELAY:
+            self._stamp = stamp
+        else:
+            self._stamp = None
+
+    def invalidate(self):
+        """Force the config file to be parsed again at the next access."""
+        self._stamp = None
+        self._dirs.clear()
 
     def get_qrcs(self):
         """Return a list of qrc names contained in the project config file."""
@@ -111,6 +188,7 @@ class PyqtcliConfig:
             else:
                 self.cparser.set(qrc, "dirs", dirs + directories)
 
+            self._dirty = True
             if commit:
                 self.save()
 
@@ -165,6 +243,7 @@ class PyqtcliConfig:
                 else:
                     self.cparser.set(qrc, "dirs", "\n" + dirs)
 
+                self._dirty = True
                 if commit:
                     self.save()
 
@@ -184,22 +263,95 @@ class PyqtcliConfig:
         """
         self.read()
         dirs = self.cparser.get(qrc, "dirs", fallback=[])
+
+        # Only split the value again if it changed since the last call
+        cached = self._dirs.get(qrc)
+        if cached is not None and cached[0] == dirs:
+            return list(cached[1])
+
         if dirs == "":
-            return []
+            directories = []
         else:
             if dirs:
                 directories = dirs.splitlines()
-                if len(directories) == 1:
-                    return directories
-                else:
-                    return directories[1:]
+                if len(directories) != 1:
+                    directories = directories[1:]
             else:
-                return dirs
+                directories = dirs
+
+        self._dirs[qrc] = (dirs, directories)
+        return list(directories)
+
+    @property
+    def sort_resources(self):
+        """bool: True if resources must be kept sorted in qrc files.
+
+        Set with the `sort_resources` option of the [project] section.
+
+        """
+        self.read()
+        return self.cparser.getboolean("project", "sort_resources",
+                                       fallback=False)
+
+    @contextmanager
+    def transaction(self):
+        """Group modifications of the config file in a single write.
+
+        Saves requested inside the transaction are delayed until its end, where
+        the config file is written once. If an exception is raised, pending
+        modifications are discarded and the config file is read again.
+        Transactions can be nested, only the outermost one writes the file.
+
+        Yields:
+            :class:`PyqtcliConfig`: The config itself.
+
+        Example:
+            >>> with config.transaction():
+            ...     config.add_dirs("res.qrc", "images")
+            ...     config.rm_dirs("res.qrc", "icons")
+
+        """
+        self._depth += 1
+        try:
+            yield self
+        except BaseException:
+            if self._depth == 1:
+                self.rollback()
+            raise
+        finally:
+            self._depth -= 1
+
+        if self._depth == 0 and self._dirty:
+            self._write()
+
+    def rollback(self):
+        """Discard modifications not written in the config file."""
+        self.cparser = configparser.ConfigParser()
+        self._dirty = False
+        self.invalidate()
+        self.read()
 
     def save(self):
-        """Save changes."""
-        with open(self.path, "w") as ini:
+        """Save changes, at the end of the current transaction if any."""
+        if self._depth:
+            self._dirty = True
+        else:
+            self._write()
+
+    def _write(self):
+        """Replace the config file by one with current settings.
+
+        The file is first written aside so that it's never left partially
+        written, even if other pyqtcli processes write it at the same time.
+
+        """
+        tmp_file = "{}.{}.tmp".format(self.path, os.getpid())
+        with open(tmp_file, "w") as ini:
             self.cparser.write(ini)
+        os.replace(tmp_file, self.path)
+
+        self._dirty = False
+        self.invalidate()
 
     def __str__(self):
         config = ""
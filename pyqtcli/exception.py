@@ -29,3 +29,23 @@ class QRCFileError(Exception):
 
     def __str__(self):
         return self.msg
+
+
+class RCCompilerError(Exception):
+    """Exception raised when the native compiler can't compile a qrc file."""
+    def __init__(self, arg):
+        super(RCCompilerError, self).__init__()
+        self.msg = arg
+
+    def __str__(self):
+        return self.msg
+
+
+class PyqtcliLockError(Exception):
+    """Exception raised when the lock of a project can't be acquired."""
+    def __init__(self, arg):
+        super(PyqtcliLockError, self).__init__()
+        self.msg = arg
+
+    def __str__(self):
+        return self.msg
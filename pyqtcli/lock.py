@@ -0,0 +1,127 @@
+"""Advisory lock of a project shared by concurrent pyqtcli processes."""
+
+import os
+import time
+
+from contextlib import contextmanager
+
+try:
+    import fcntl
+except ImportError:  # Not available on Windows
+    fcntl = None
+
+from pyqtcli.exception import PyqtcliLockError
+
+
+class ProjectLock:
+    """Advisory lock on a lock file of the project directory.
+
+    Commands only reading project files share the lock while commands
+    modifying them hold it exclusively. The lock is released when the
+    process exits, even if it's killed. Locks aren't reentrant: a process
+    holding the lock must not try to acquire it again. On platforms without
+    :mod:`fcntl`, locking does nothing.
+
+    Attributes:
+        path (str): Absolute path to the lock file.
+        timeout (float): Maximal number of seconds to wait for the lock, None
+            to wait as long as needed.
+        _fd (int): File descriptor of the lock file while the lock is held.
+
+    """
+
+    LOCK_FILE = ".pyqtclilock"
+    POLL_INTERVAL = 0.05
+
+    def __init__(self, path, timeout=None):
+        self.path = os.path.abspath(path)
+        self.timeout = timeout
+        self._fd = None
+
+    @classmethod
+    def for_project(cls, project, timeout=None):
+        """Return the lock of a project.
+
+        Args:
+            project (:class:`pyqtcli.config.ProjectContext`): Project paths.
+            timeout (Optional[float]): Maximal number of seconds to wait for
+                the lock.
+
+        Returns:
+            :class:`ProjectLock`: Lock in the project directory.
+
+        """
+        return cls(os.path.join(project.root_path, cls.LOCK_FILE), timeout)
+
+    def acquire(self, exclusive=True):
+        """Wait for the lock to be available and take it.
+
+        Args:
+            exclusive (Optional[bool]): If False, the lock is shared with
+                other processes acquiring it as shared.
+
+        Raises:
+            :class:`PyqtcliLockError`: Raised when the lock isn't available
+                after `timeout` seconds.
+
+        """
+        if fcntl is None:
+            return
+
+        try:
+            self._fd = os.open(self.path, os.O_RDWR | os.O_CREAT, 0o644)
+        except OSError:
+            # Read-only projects can't be modified concurrently anyway
+            return
+
+        operation = fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH
+        try:
+            self._wait(operation)
+        except BaseException:
+            self.release()
+            raise
+
+    def _wait(self, operation):
+        """Lock the opened lock file within `timeout` seconds."""
+        if self.timeout is None:
+            fcntl.flock(self._fd, operation)
+            return
+
+        deadline = time.monotonic() + self.timeout
+        while True:
+            try:
+                fcntl.flock(self._fd, operation | fcntl.LOCK_NB)
+                return
+            except BlockingIOError:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PyqtcliLockError(
+                        ("Timed out after {}s waiting for another "
+                         "pyqtcli process to release the project.").format(
+                            self.timeout))
+                time.sleep(min(self.POLL_INTERVAL, remaining))
+
+    def release(self):
+        """Release the lock if it's held."""
+        if self._fd is not None:
+            # Closing the file releases its lock
+            os.close(self._fd)
+            self._fd = None
+
+    @contextmanager
+    def shared(self):
+        """Hold the lock shared with other readers in a with statement."""
+        self.acquire(exclusive=False)
+        try:
+            yield self
+        finally:
+            self.release()
+
+    @contextmanager
+    def exclusive(self):
+        """Hold the lock exclusively in a with statement."""
+        self.acquire()
+        try:
+            yield self
+        finally:
+            self.release()
@@ -1,63 +1,242 @@
 import os
+import hashlib
+
+from functools import partial
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
 from lxml import etree
 
 from pyqtcli import verbose as v
+from pyqtcli.qrc import write_tree
+from pyqtcli.utils import unique_paths
 
 WARNING_TEMPLATE = "Alias \'{}\' already exists in \'{}\' at prefix \'{}\'."
+COLLISION_TEMPLATE = " Resources sharing it: {}."
+
+# Ways to give an alias to resources whose base name is already an alias
+COLLISION_STRATEGIES = ("skip", "parent", "hash")
+
+
+def parent_alias(path, depth=1):
+    """Qualify the base name of a resource with its parent directories.
+
+    Args:
+        path (str): Path to the resource.
+        depth (Optional[int]): Number of parent directories in the alias.
+
+    Returns:
+        str: Alias like "images/icon.png" for "res/images/icon.png".
+
+    """
+    parts = path.replace(os.sep, "/").split("/")
+    return "/".join(parts[-depth - 1:])
+
+
+def hash_alias(path):
+    """Suffix the base name of a resource with a hash of its path.
+
+    Args:
+        path (str): Path to the resource.
+
+    Returns:
+        str: Alias like "icon_1a2b3c4d.png" for "res/images/icon.png".
+
+    """
+    name, ext = os.path.splitext(os.path.basename(path))
+    digest = hashlib.sha1(path.encode("utf-8")).hexdigest()[:8]
+    return "{}_{}{}".format(name, digest, ext)
+
+
+def _parent_aliases(paths, taken):
+    """Find the shortest parent-qualified aliases telling paths apart.
+
+    Args:
+        paths (list): Paths to resources sharing the same base name.
+        taken (dict): Aliases already used in the qresource.
+
+    Returns:
+        list: Alias of each path, None when no qualified alias is free.
+
+    """
+    max_depth = max(path.replace(os.sep, "/").count("/") for path in paths)
+    aliases = [None] * len(paths)
+
+    # Qualify remaining paths with one more parent at each step
+    pending = list(range(len(paths)))
+    for depth in range(1, max_depth + 1):
+        candidates = OrderedDict()
+        for i in pending:
+            alias = parent_alias(paths[i], depth)
+            candidates.setdefault(alias, []).append(i)
+
+        pending = []
+        for alias, indexes in candidates.items():
+            if len(indexes) == 1 and alias not in taken:
+                aliases[indexes[0]] = alias
+            else:
+                pending.extend(indexes)
+
+        if not pending:
+            break
+
+    return aliases
+
+
+def assign_aliases(qresource, strategy="skip"):
+    """Give an alias to each resource of a qresource lacking one.
+
+    Resources are grouped by alias in a single pass, existing aliases being
+    kept. Within a group of resources sharing an alias, the one already
+    holding it, or else the first one, gets it. Others get an alias from the
+    collision strategy:
+
+    * "skip": they get no alias.
+    * "parent": their base name is qualified with as many parent
+      directories as needed to tell them apart.
+    * "hash": their base name is suffixed with a hash of their path.
 
+    Args:
+        qresource (:class:`etree.Element`): Qresource element.
+        strategy (Optional[str]): Collision strategy among
+            `COLLISION_STRATEGIES`.
+
+    Returns:
+        tuple: List of tuples of path and alias of resources which got an
+            alias, and list of tuples of alias and paths of resources sharing
+            it, for each collision.
+
+    """
+    # Alias are prefixed by qresource prefix so duplication is only checked
+    # within qresource
+    groups = OrderedDict()
+    for resource in qresource.iter(tag="file"):
+        alias = resource.get("alias") or os.path.basename(resource.text)
+        groups.setdefault(alias, []).append(resource)
+
+    assigned = []
+    collisions = []
+    for alias, resources in list(groups.items()):
+        # The resource holding the alias keeps it
+        holder = next((res for res in resources if res.get("alias")),
+                      resources[0])
+        if not holder.get("alias"):
+            holder.set("alias", alias)
+            assigned.append((holder.text, alias))
+
+        if len(resources) == 1:
+            continue
+
+        collisions.append((alias, [res.text for res in resources]))
+        others = [res for res in resources
+                  if res is not holder and not res.get("alias")]
+        if not others or strategy == "skip":
+            continue
+
+        if strategy == "parent":
+            new_aliases = _parent_aliases([res.text for res in others],
+                                          groups)
+        else:
+            new_aliases = [hash_alias(res.text) for res in others]
+
+        for res, new_alias in zip(others, new_aliases):
+            if new_alias is None or new_alias in groups:
+                continue
+            res.set("alias", new_alias)
+            groups[new_alias] = [res]
+            assigned.append((res.text, new_alias))
+
+    return assigned, collisions
+
+
+def _alias_qrc(qrc_file, strategy):
+    """Give an alias to resources of a qrc file lacking one.
+
+    The qrc file is only rewritten if an alias was added, so that its rc file
+    isn't rebuilt.
+
+    Args:
+        qrc_file (str): Path to the qrc file.
+        strategy (str): Collision strategy among `COLLISION_STRATEGIES`.
+
+    Returns:
+        tuple: List of tuples of path and alias of resources which got an
+            alias and list of warning messages.
 
-def write_alias(qrc_files, verbose):
+    """
+    tree = etree.parse(qrc_file)
+    root = tree.getroot()
+
+    assigned = []
+    warnings = []
+    # Iterate over each qresource containing file resources
+    for qresource in root.iter(tag="qresource"):
+        qresource_assigned, collisions = assign_aliases(qresource, strategy)
+        assigned.extend(qresource_assigned)
+
+        # Add same alias warnings
+        for alias, paths in collisions:
+            warnings.append(
+                WARNING_TEMPLATE.format(
+                    alias, qrc_file, qresource.attrib.get("prefix", "")) +
+                COLLISION_TEMPLATE.format(", ".join(paths))
+            )
+
+    if assigned:
+        write_tree(tree, qrc_file, pretty_print=False)
+
+    return assigned, warnings
+
+
+def write_alias(qrc_files, verbose, strategy="skip", jobs=None):
     """Write alias for resources within qrc files.
 
     Alias are base in basename of theses resources. In the case where two
     resource files would have the same name, and so, the same alias, the
-    script warns the user of incriminated files.
+    script warns the user of incriminated files and applies the collision
+    strategy. Qrc files are processed in parallel but messages are displayed
+    in the order of `qrc_files`, and only qrc files which got new aliases are
+    rewritten. Paths leading to an already processed qrc file are skipped.
 
     Args:
         qrc_files (list or tuple): A list containing path to qrc files.
         verbose (bool): True if the user pass '-v' or '--verbose' option
             to see what's happening.
+        strategy (Optional[str]): Collision strategy among
+            `COLLISION_STRATEGIES`, see :func:`assign_aliases`.
+        jobs (Optional[int]): Maximum number of qrc files processed at the
+            same time. Defaults to the number of CPUs.
+
+    Returns:
+        list: Paths to the qrc files which were rewritten.
+
     """
+    jobs = jobs or os.cpu_count() or 1
+
+    # Each qrc file must be processed by a single thread
+    qrc_files = unique_paths(qrc_files)
+
+    rewritten = []
     warnings = []  # List containing all warnings message
-    # Loop over all provided qrc files
-    for qrc_file in qrc_files:
-        tree = etree.parse(qrc_file)
-        root = tree.getroot()
-
-        # Inform which qrc file is processed
-        v.info("Current file: {}".format(qrc_file), verbose)
-
-        # Iterate over each qresource containing file resources
-        for qresource in root.iter(tag="qresource"):
-            # Alias are prefixed by qresource prefix so we check only
-            # duplication within qresource
-            aliases = []
-            # Iterate over each file that doesn't have already an alias
-            for resource in qresource.iter(tag="file"):
-                alias = os.path.basename(resource.text)
-                if alias not in aliases:
-                    if not resource.attrib.get("alias", None):
-                        resource.set("alias", alias)
-
-                        # Inform which alias is given to the current resource
-                        v.info("resource: '{}' => {}".format(
-                            resource.text, alias), verbose)
-                else:
-                    # Add same alias warning
-                    warnings.append(WARNING_TEMPLATE.format(
-                        alias, qrc_file, qresource.attrib.get(
-                            "prefix", ""))
-                    )
-                    break
-
-                # Append created alias to used aliases in current qresource
-                aliases.append(alias)
-
-        # Rewrite qrc file
-        tree.write(qrc_file)
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(partial(_alias_qrc, strategy=strategy),
+                               qrc_files)
+
+        for qrc_file, (assigned, qrc_warnings) in zip(qrc_files, results):
+            # Inform which qrc file is processed
+            v.info("Current file: {}".format(qrc_file), verbose)
+
+            # Inform which alias is given to each resource
+            for path, alias in assigned:
+                v.info("resource: '{}' => {}".format(path, alias), verbose)
+
+            warnings.extend(qrc_warnings)
+            if assigned:
+                rewritten.append(qrc_file)
 
     # Warning user of which resources that could not receive alias
     # because of duplication
     for message in warnings:
         v.warning(message)
+
+    return rewritten
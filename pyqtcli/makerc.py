@@ -1,22 +1,834 @@
 import os
+import re
+import zlib
+import hashlib
+import tempfile
+import itertools
+import posixpath
 import subprocess
 
+from functools import partial
+from collections import OrderedDict
+from functools import lru_cache
+from concurrent.futures import ThreadPoolExecutor
+
+from lxml import etree
+
 from pyqtcli import verbose as v
+from pyqtcli.qrc import read_qrc
+from pyqtcli.qrc import read_qrc_index
+from pyqtcli.exception import QRCFileError
+from pyqtcli.exception import RCCompilerError
 
 
 # Error message send by pyrcc5 when qrc file doesn't contain resources
 NO_QRESOURCE = b"No resources in resource description.\n"
 INVALID_QRC = b"pyrcc5 Parse Error:"
 
+# Tools available to generate rc files
+BACKENDS = ("pyrcc5", "native")
+
+# Formats of generated resources: python module or binary resource file
+RC_FORMATS = ("python", "rcc")
+
+# Default compression of resources used by pyrcc5
+COMPRESS_LEVEL = -1
+COMPRESS_THRESHOLD = 70
+
+# Size of the chunks in which resources are read by the native compiler
+CHUNK_SIZE = 64 * 1024
+
+# Version of the binary resource format written by the native compiler,
+# the one of Qt 5.8 and later
+RCC_FORMAT_VERSION = 2
+
+RCC_HEADER = """\
+# -*- coding: utf-8 -*-
+
+# Resource object code
+#
+# Created by: The Resource Compiler for PyQt5 (Qt v{})
+#
+# WARNING! All changes made in this file will be lost!
+
+from PyQt5 import QtCore
+
+"""
+
+RCC_FOOTER = """\
+qt_version = [int(v) for v in QtCore.qVersion().split('.')]
+if qt_version < [5, 8, 0]:
+    rcc_version = 1
+    qt_resource_struct = qt_resource_struct_v1
+else:
+    rcc_version = 2
+    qt_resource_struct = qt_resource_struct_v2
+
+def qInitResources():
+    QtCore.qRegisterResourceData(rcc_version, qt_resource_struct, \
+qt_resource_name, qt_resource_data)
+
+def qCleanupResources():
+    QtCore.qUnregisterResourceData(rcc_version, qt_resource_struct, \
+qt_resource_name, qt_resource_data)
+
+qInitResources()
+"""
+
+RCC_INDEX = """\
+# -*- coding: utf-8 -*-
+
+# Resource index
+#
+# Created by: pyqtcli
+#
+# WARNING! All changes made in this file will be lost!
+
+import importlib
+
+rc_modules = {{
+{}}}
+
+def ensure_loaded(prefix):
+    \"\"\"Register resources of a qresource prefix if not already done.\"\"\"
+    module = rc_modules["/" + prefix.strip("/")]
+    if __package__:
+        importlib.import_module("." + module, __package__)
+    else:
+        importlib.import_module(module)
+"""
+
+RCC_LOADER = """\
+# -*- coding: utf-8 -*-
+
+# Resource loader
+#
+# Created by: pyqtcli
+#
+# WARNING! All changes made in this file will be lost!
+
+import os
+
+from PyQt5 import QtCore
+
+rcc_file = os.path.join(os.path.dirname(os.path.abspath(__file__)), "{}")
+
+def qInitResources():
+    QtCore.QResource.registerResource(rcc_file)
+
+def qCleanupResources():
+    QtCore.QResource.unregisterResource(rcc_file)
+
+qInitResources()
+"""
+
+
+def run_pyrcc5(qrc_file, cache=None):
+    """Generate the rc file of a qrc file with pyrcc5 tool.
+
+    If a cache is given and contains the rc file corresponding to the current
+    state of the qrc file and its resources, pyrcc5 isn't launched.
+
+    Args:
+        qrc_file (str): Path to the qrc file.
+        cache (Optional[:class:`pyqtcli.cache.BuildCache`]): Cache of
+            generated rc files.
+
+    Returns:
+        tuple: Path to the rc file and error output of pyrcc5.
+
+    """
+    # rc file name
+    result_file = os.path.splitext(qrc_file)[0] + "_rc.py"
+
+    key = cache.key(qrc_file) if cache else None
+    if key and cache.restore(key, result_file):
+        return result_file, b""
+
+    # generate rc file corresponding to qrc file
+    result = subprocess.run(["pyrcc5", qrc_file, "-o", result_file],
+                            stderr=subprocess.PIPE)
+
+    if key and not result.stderr and result.returncode == 0:
+        cache.store(key, result_file)
+
+    return result_file, result.stderr
+
+
+def run_native(qrc_file, cache=None, rc_format="python"):
+    """Generate the rc file of a qrc file without launching pyrcc5.
+
+    The rc file is compiled in-process by :func:`write_rc`. Errors are
+    reported with the messages pyrcc5 would have written so that both
+    backends are handled the same way. Qrc files using features the native
+    compiler doesn't support are given to pyrcc5.
+
+    With the rcc format, resources are written to a binary resource file by
+    :func:`write_rcc` and the rc file only registers it, so that importing
+    it doesn't load resources in memory.
+
+    Args:
+        qrc_file (str): Path to the qrc file.
+        cache (Optional[:class:`pyqtcli.cache.BuildCache`]): Cache of
+            generated rc files.
+        rc_format (Optional[str]): Format of generated resources, "python"
+            or "rcc".
+
+    Returns:
+        tuple: Path to the rc file and error output of the compilation.
+
+    """
+    # rc file name
+    result_file = os.path.splitext(qrc_file)[0] + "_rc.py"
+    rcc_file = None
+    if rc_format == "rcc":
+        rcc_file = os.path.splitext(qrc_file)[0] + ".rcc"
+
+    compiler = "native {} Qt v{}".format(rc_format, native_version())
+    key = cache.key(qrc_file, compiler) if cache else None
+    if key and _restore(cache, key, result_file, rcc_file):
+        return result_file, b""
+
+    try:
+        qrc = read_qrc(qrc_file)
+    except etree.XMLSyntaxError as e:
+        return result_file, INVALID_QRC + "{} [{}]\n".format(
+            qrc_file, e.msg).encode("utf-8")
+
+    try:
+        root, errors = resource_tree(qrc)
+    except RCCompilerError as e:
+        if rcc_file:
+            return result_file, "{}: {}\n".format(qrc_file, e).encode("utf-8")
+        return run_pyrcc5(qrc_file, cache)
+
+    stderr = "".join(error + "\n" for error in errors).encode("utf-8")
+    if root is None:
+        return result_file, stderr + NO_QRESOURCE
+
+    _write_resources(root, result_file, rcc_file)
+
+    if key and not stderr:
+        cache.store(key, rcc_file or result_file)
 
-def generate_rc(qrc_files, verbose):
+    return result_file, stderr
+
+
+def run_split(qrc_file, cache=None, rc_format="python"):
+    """Generate one rc file per qresource prefix and an index module.
+
+    Rc files of prefixes are named after the qrc file and the prefix, like
+    res_rc_images.py for the "/images" prefix of res.qrc, and are generated
+    by the native compiler. The index module, named like the usual rc file,
+    registers nothing when imported: its `ensure_loaded` function imports
+    the rc file of a prefix the first time it is called with it.
+
+    Args:
+        qrc_file (str): Path to the qrc file.
+        cache (Optional[:class:`pyqtcli.cache.BuildCache`]): Cache of
+            generated rc files.
+        rc_format (Optional[str]): Format of generated resources, "python"
+            or "rcc".
+
+    Returns:
+        tuple: Path to the index module and error output of the compilation.
+
+    """
+    base = os.path.splitext(qrc_file)[0]
+    result_file = base + "_rc.py"
+
+    try:
+        qrc = read_qrc(qrc_file)
+    except etree.XMLSyntaxError as e:
+        return result_file, INVALID_QRC + "{} [{}]\n".format(
+            qrc_file, e.msg).encode("utf-8")
+
+    # Group qresources sharing the same prefix
+    prefixes = OrderedDict()
+    for qresource in qrc.qresources:
+        prefix = "/" + qresource.get("prefix", "").strip("/")
+        prefixes.setdefault(prefix, []).append(qresource)
+
+    compiler = "native {} Qt v{}".format(rc_format, native_version())
+    key = cache.key(qrc_file, compiler) if cache else None
+
+    modules = OrderedDict()
+    names = set()
+    stderr = b""
+    for prefix, qresources in prefixes.items():
+        name = _module_name(prefix, names)
+        names.add(name)
+        module = "{}_rc_{}".format(os.path.basename(base), name)
+        module_file = os.path.join(os.path.dirname(result_file),
+                                   module + ".py")
+        rcc_file = None
+        if rc_format == "rcc":
+            rcc_file = os.path.splitext(module_file)[0] + ".rcc"
+
+        prefix_key = None
+        if key:
+            prefix_key = hashlib.sha256(
+                (key + prefix).encode("utf-8")).hexdigest()
+            if _restore(cache, prefix_key, module_file, rcc_file):
+                modules[prefix] = module
+                continue
+
+        try:
+            root, errors = resource_tree(qrc, qresources)
+        except RCCompilerError as e:
+            return result_file, "{}: {}\n".format(qrc_file, e).encode("utf-8")
+
+        errors = "".join(error + "\n" for error in errors).encode("utf-8")
+        stderr += errors
+        if root is None:
+            continue
+
+        _write_resources(root, module_file, rcc_file)
+        modules[prefix] = module
+
+        if prefix_key and not errors:
+            cache.store(prefix_key, rcc_file or module_file)
+
+    if not modules:
+        return result_file, stderr + NO_QRESOURCE
+
+    write_index(result_file, modules)
+
+    return result_file, stderr
+
+
+def _module_name(prefix, names):
+    """Return an identifier for a prefix not found in `names`."""
+    name = re.sub(r"\W", "_", prefix.strip("/")) or "root"
+
+    unique = name
+    i = 1
+    while unique in names:
+        unique = "{}_{}".format(name, i)
+        i += 1
+
+    return unique
+
+
+def _restore(cache, key, result_file, rcc_file=None):
+    """Restore a cached rc file or rcc file with its loader."""
+    if not cache.restore(key, rcc_file or result_file):
+        return False
+
+    if rcc_file:
+        write_loader(result_file, rcc_file)
+
+    return True
+
+
+def _write_resources(root, result_file, rcc_file=None):
+    """Write a tree of resources in a rc file or in a rcc file and its loader.
+
+    Files are written under a temporary name and then renamed, so that an
+    interrupted compilation doesn't leave truncated files.
+
+    """
+    if rcc_file:
+        tmp_file = "{}.{}.tmp".format(rcc_file, os.getpid())
+        with open(tmp_file, "wb") as f:
+            write_rcc(root, f)
+        os.replace(tmp_file, rcc_file)
+        write_loader(result_file, rcc_file)
+    else:
+        tmp_file = "{}.{}.tmp".format(result_file, os.getpid())
+        with open(tmp_file, "w", encoding="utf-8", newline="\n") as f:
+            write_rc(root, f)
+        os.replace(tmp_file, result_file)
+
+
+def write_index(rc_file, modules):
+    """Write the index module loading rc files of prefixes on demand.
+
+    Args:
+        rc_file (str): Path to the index module.
+        modules (dict): Map prefixes to the name of their rc module, located
+            in the same directory as the index.
+
+    """
+    entries = "".join('    "{}": "{}",\n'.format(prefix, module)
+                      for prefix, module in modules.items())
+
+    with open(rc_file, "w", encoding="utf-8", newline="\n") as f:
+        f.write(RCC_INDEX.format(entries))
+
+
+def write_loader(rc_file, rcc_file):
+    """Write the python module registering a binary resource file.
+
+    The path of the resource file is resolved from the module location, so
+    both files have to stay in the same directory.
+
+    Args:
+        rc_file (str): Path to the python module.
+        rcc_file (str): Path to the binary resource file.
+
+    """
+    with open(rc_file, "w", encoding="utf-8", newline="\n") as f:
+        f.write(RCC_LOADER.format(os.path.basename(rcc_file)))
+
+
+def is_up_to_date(qrc_file):
+    """Check if the rc file of a qrc file is newer than it and its resources.
+
+    Args:
+        qrc_file (str): Path to the qrc file.
+
+    Returns:
+        bool: True if the rc file doesn't need to be generated again.
+
+    """
+    result_file = os.path.splitext(qrc_file)[0] + "_rc.py"
+    try:
+        rc_mtime = os.stat(result_file).st_mtime_ns
+        dir_path = os.path.dirname(qrc_file)
+        paths = [qrc_file] + [
+            os.path.join(dir_path, resource)
+            for entries in read_qrc_index(qrc_file).values()
+            for resource, _ in entries]
+
+        # Files modified in the same tick as the rc file could be newer
+        return all(os.stat(path).st_mtime_ns < rc_mtime for path in paths)
+    except (OSError, TypeError, QRCFileError, etree.XMLSyntaxError):
+        return False
+
+
+@lru_cache(maxsize=None)
+def native_version():
+    """Return the Qt version written in rc files by the native compiler.
+
+    Returns:
+        str: Version of Qt used by PyQt5 or "unknown" if PyQt5 is missing.
+
+    """
+    try:
+        from PyQt5.QtCore import QT_VERSION_STR
+    except ImportError:
+        return "unknown"
+
+    return QT_VERSION_STR
+
+
+def resource_tree(qrc, qresources=None):
+    """Build the tree of resources compiled from a qrc file.
+
+    Resources are laid out like the resource compiler does: each alias,
+    prefixed by its qresource prefix, is split into directories ending with
+    the resource. Resources themselves are only read by :func:`write_rc`.
+
+    Args:
+        qrc (:class:`pyqtcli.qrc.QRCFile`): Qrc file to compile.
+        qresources (Optional[list]): <qresource> elements of `qrc` to
+            compile. Defaults to all of them.
+
+    Returns:
+        tuple: Root directory of the tree, or None if the qrc file has no
+            resources, and the list of error messages.
+
+    Raises:
+        :class:`RCCompilerError`: Raised when the qrc file records a
+            directory or uses the `lang` attribute.
+
+    """
+    root = None
+    errors = []
+
+    for qresource in qresources or qrc.qresources:
+        if qresource.get("lang"):
+            raise RCCompilerError("lang attribute is not supported")
+
+        prefix = qresource.get("prefix", "")
+        if not prefix.startswith("/"):
+            prefix = "/" + prefix
+        if not prefix.endswith("/"):
+            prefix += "/"
+
+        for res in qresource.iter(tag="file"):
+            file_name = res.text or ""
+            path = os.path.join(qrc.dir_path, file_name)
+
+            if os.path.isdir(path):
+                raise RCCompilerError("directories are not supported")
+            if not file_name or not os.path.isfile(path):
+                errors.append("Cannot find file: {}".format(file_name))
+                continue
+
+            alias = posixpath.normpath(res.get("alias") or file_name)
+            while alias.startswith("../"):
+                alias = alias[3:]
+
+            if root is None:
+                root = _RCCNode("")
+
+            # Create intermediate directories of the resource path
+            parent = root
+            nodes = (prefix + alias).split("/")
+            for name in nodes[1:-1]:
+                if not name:
+                    continue
+                if name not in parent.children:
+                    parent.children[name] = [_RCCNode(name)]
+                parent = parent.children[name][0]
+
+            node = _RCCNode(nodes[-1], path,
+                            _int_attr(res, "compress", COMPRESS_LEVEL),
+                            _int_attr(res, "threshold", COMPRESS_THRESHOLD))
+            # Resources with the same alias are listed newest first
+            parent.children.setdefault(node.name, []).insert(0, node)
+
+    return root, errors
+
+
+def write_rc(root, output):
+    """Write the python module generated by pyrcc5 for a tree of resources.
+
+    The module is identical to the pyrcc5 one when no resource is
+    compressed. Compression is controlled by the `compress` and `threshold`
+    attributes of <file> elements. Resources are streamed to `output` by
+    chunks of :data:`CHUNK_SIZE` bytes so that memory usage doesn't depend
+    on their size.
+
+    Args:
+        root (:class:`_RCCNode`): Root directory returned by
+            :func:`resource_tree`.
+        output (file): Text file where the module is written.
+
+    """
+    write = output.write
+
+    write(RCC_HEADER.format(native_version()))
+
+    # Data are written first as offsets and compression of resources are
+    # needed in the other sections
+    write('qt_resource_data = b"\\\n')
+    for chunks in _data(root):
+        size = next(chunks)
+        write(_hex(size.to_bytes(4, "big")) + "\\\n")
+        _write_hex(write, chunks)
+    write('"\n\n')
+
+    write('qt_resource_name = b"\\\n')
+    for length, name_hash, name in _names(root):
+        write(_hex(length) + "\\\n")
+        write(_hex(name_hash) + "\\\n")
+        _write_hex(write, [name], 2)
+    write('"\n\n')
+
+    for version in (1, 2):
+        write('qt_resource_struct_v{} = b"\\\n'.format(version))
+        for entry in _struct(root, version):
+            write("".join(_hex(part) + "\\\n" for part in entry))
+        write('"\n\n')
+
+    write(RCC_FOOTER)
+
+
+def write_rcc(root, output):
+    """Write the binary resource file generated by `rcc -binary`.
+
+    The file starts with a header made of the "qres" magic number, the
+    format version and the offsets of the tree, data and names sections,
+    all big-endian 32 bits integers. Sections hold the same bytes as the
+    python module, data first. Resources are streamed like in
+    :func:`write_rc`.
+
+    Args:
+        root (:class:`_RCCNode`): Root directory returned by
+            :func:`resource_tree`.
+        output (file): Binary file where the resources are written.
+
+    """
+    write = output.write
+
+    # Offsets of the header are known once the sections are written
+    header_size = 20
+    write(bytes(header_size))
+
+    data_offset = header_size
+    size = 0
+    for chunks in _data(root):
+        write(next(chunks).to_bytes(4, "big"))
+        size += 4
+        for chunk in chunks:
+            write(chunk)
+            size += len(chunk)
+
+    names_offset = data_offset + size
+    size = 0
+    for entry in _names(root):
+        write(b"".join(entry))
+        size += sum(len(part) for part in entry)
+
+    tree_offset = names_offset + size
+    for entry in _struct(root, RCC_FORMAT_VERSION):
+        write(b"".join(entry))
+
+    output.seek(0)
+    write(b"qres" + b"".join(
+        n.to_bytes(4, "big") for n in (RCC_FORMAT_VERSION, tree_offset,
+                                       data_offset, names_offset)))
+    output.seek(0, os.SEEK_END)
+
+
+def _int_attr(element, name, default):
+    """Read an integer attribute like the resource compiler does."""
+    value = element.get(name)
+    if value is None:
+        return default
+
+    try:
+        return int(value)
+    except ValueError:
+        return 0
+
+
+class _RCCNode:
+    """Directory or file of the resource tree of a compiled qrc file.
+
+    Attributes:
+        name (str): Name of the node in its parent directory.
+        path (str): Absolute path to the resource or None for directories.
+        compress_level (int): zlib compression level of the resource.
+        compress_threshold (int): Minimal size reduction in percent to keep
+            the compressed resource.
+        compressed (bool): True if the resource has been compressed.
+        children (dict): Map names to the children of the directory having
+            this name.
+        name_offset (int): Offset of the name in qt_resource_name.
+        data_offset (int): Offset of the resource in qt_resource_data.
+        child_offset (int): Index of the first child in qt_resource_struct.
+
+    """
+
+    DIRECTORY = 0x02
+    COMPRESSED = 0x01
+
+    def __init__(self, name, path=None, compress_level=COMPRESS_LEVEL,
+                 compress_threshold=COMPRESS_THRESHOLD):
+        self.name = name
+        self.path = path
+        self.compress_level = compress_level
+        self.compress_threshold = compress_threshold
+        self.compressed = False
+        self.children = {} if path is None else None
+        self.name_offset = 0
+        self.data_offset = 0
+        self.child_offset = 0
+        self._sorted_children = None
+
+    def sorted_children(self):
+        """Children sorted by name hash as expected by QResource lookup."""
+        if self._sorted_children is None:
+            children = [c for nodes in self.children.values() for c in nodes]
+            self._sorted_children = sorted(
+                children, key=lambda child: _qt_hash(child.name))
+
+        return self._sorted_children
+
+
+def _qt_hash(key):
+    """qt_hash of a QString used to sort resource names."""
+    h = 0
+    data = key.encode("utf-16-be")
+    for i in range(0, len(data), 2):
+        h = (h << 4) + int.from_bytes(data[i:i + 2], "big")
+        h ^= (h & 0xf0000000) >> 23
+        h &= 0x0fffffff
+    return h
+
+
+# Escaped representation of each byte in python bytes literals
+_HEX = ["\\x{:02x}".format(i) for i in range(256)]
+
+
+def _hex(data):
+    return "".join(map(_HEX.__getitem__, data))
+
+
+def _write_hex(write, chunks, unit=1):
+    """Write chunks of data in lines like the resource compiler does.
+
+    The first unit is alone on its line, then units are written 16 per line
+    and the remaining units end the last line, even if empty.
+
+    """
+    line_size = unit  # Size in bytes of the current line
+    line_len = 0      # Bytes already written on the current line
+    for chunk in chunks:
+        text = _hex(chunk)
+        parts = []
+        pos = 0
+        # Each byte takes 4 characters
+        while len(text) - pos >= 4 * (line_size - line_len):
+            end = pos + 4 * (line_size - line_len)
+            parts.append(text[pos:end])
+            parts.append("\\\n")
+            pos = end
+            line_len = 0
+            line_size = 16 * unit
+        parts.append(text[pos:])
+        line_len += (len(text) - pos) // 4
+        write("".join(parts))
+
+    write("\\\n")
+
+
+def _read_chunks(f):
+    """Yield the content of a file by chunks of CHUNK_SIZE bytes."""
+    while True:
+        chunk = f.read(CHUNK_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+
+def _data(root):
+    """Yield for each resource the iterator of :func:`_resource_data`."""
+    offset = 0
+    for directory, children in _walk_directories(root):
+        for child in children:
+            if child.children is None:
+                child.data_offset = offset
+                chunks = _resource_data(child)
+                size = next(chunks)
+                offset += 4 + size
+                yield itertools.chain([size], chunks)
+
+
+def _resource_data(node):
+    """Yield the size of a resource, compressed if worthwhile, then its data.
+
+    The data are yielded by chunks and the compression flag of `node` is set
+    once its size is yielded.
+
+    """
+    size = os.path.getsize(node.path)
+
+    with open(node.path, "rb") as f:
+        if node.compress_level != 0 and size:
+            level = node.compress_level
+            if not -1 <= level <= 9:
+                level = -1
+
+            # Compress to a file spilled on disk past CHUNK_SIZE bytes as
+            # the compressed size is needed before deciding to keep it
+            with tempfile.SpooledTemporaryFile(CHUNK_SIZE) as tmp:
+                compressor = zlib.compressobj(level)
+                for chunk in _read_chunks(f):
+                    tmp.write(compressor.compress(chunk))
+                tmp.write(compressor.flush())
+
+                # qCompress prefixes zlib stream with the uncompressed size
+                compressed_size = 4 + tmp.tell()
+                ratio = int(100.0 * (size - compressed_size) / size)
+                if ratio >= node.compress_threshold:
+                    node.compressed = True
+                    yield compressed_size
+                    yield size.to_bytes(4, "big")
+                    tmp.seek(0)
+                    yield from _read_chunks(tmp)
+                    return
+
+            f.seek(0)
+
+        yield size
+        yield from _read_chunks(f)
+
+
+def _walk_directories(root):
+    """Yield directories depth first in the order of the resource compiler."""
+    pending = [root]
+    while pending:
+        directory = pending.pop()
+        children = directory.sorted_children()
+        yield directory, children
+        pending.extend(c for c in children if c.children is not None)
+
+
+def _names(root):
+    """Yield length, hash and UTF-16 characters of each distinct name."""
+    names = {}
+    offset = 0
+    for directory, children in _walk_directories(root):
+        for child in children:
+            if child.name in names:
+                child.name_offset = names[child.name]
+                continue
+
+            names[child.name] = child.name_offset = offset
+            name = child.name.encode("utf-16-be")
+            offset += 6 + len(name)
+
+            yield ((len(name) // 2).to_bytes(2, "big"),
+                   _qt_hash(child.name).to_bytes(4, "big"), name)
+
+
+def _struct(root, version):
+    """Yield the entry of each node of the tree in the structure section."""
+    # Children of a directory are stored contiguously from its child offset
+    offset = 1
+    for directory, children in _walk_directories(root):
+        directory.child_offset = offset
+        offset += len(children)
+
+    yield _struct_entry(root, version)
+    for directory, children in _walk_directories(root):
+        for child in children:
+            yield _struct_entry(child, version)
+
+
+def _struct_entry(node, version):
+    if node.children is not None:
+        entry = [node.name_offset.to_bytes(4, "big") +
+                 node.DIRECTORY.to_bytes(2, "big") +
+                 len(node.sorted_children()).to_bytes(4, "big") +
+                 node.child_offset.to_bytes(4, "big")]
+        last_modified = 0
+    else:
+        flags = node.COMPRESSED if node.compressed else 0
+        # Country is AnyCountry and language is C
+        entry = [node.name_offset.to_bytes(4, "big") +
+                 flags.to_bytes(2, "big") +
+                 (0).to_bytes(2, "big") + (1).to_bytes(2, "big") +
+                 node.data_offset.to_bytes(4, "big")]
+        last_modified = os.stat(node.path).st_mtime_ns // 10 ** 6
+
+    if version >= 2:
+        entry.append(last_modified.to_bytes(8, "big"))
+
+    return entry
+
+
+def generate_rc(qrc_files, verbose, jobs=None, cache=None, backend="pyrcc5",
+                rc_format="python", split=False):
     """Generate python module to access qrc resources via pyrcc5 tool.
 
+    pyrcc5 processes are run in parallel but messages are displayed in the
+    order of `qrc_files`. With the native backend, rc files are compiled
+    in-process instead of launching pyrcc5. Binary resource files of the rcc
+    format and rc files split by prefix are always generated by the native
+    compiler.
+
     Args:
         qrc_files (list or tuple): A tuple containing all paths to qrc files
             to process.
         verbose (bool): True if the user pass '-v' or '--verbose' option
             to see what's happening.
+        jobs (Optional[int]): Maximum number of pyrcc5 processes run at the
+            same time. Defaults to the number of CPUs.
+        cache (Optional[:class:`pyqtcli.cache.BuildCache`]): Cache of
+            generated rc files used to skip pyrcc5 when nothing changed.
+        backend (Optional[str]): Tool generating rc files, "pyrcc5" or
+            "native".
+        rc_format (Optional[str]): Format of generated resources, "python"
+            for modules embedding them or "rcc" for binary resource files
+            registered by a loader module.
+        split (Optional[bool]): If True, one rc file is generated per
+            qresource prefix with an index module loading them on demand.
 
     Examples:
         This example will create two files: res_rc.py and qtc/another_res_rc.py
@@ -24,25 +836,40 @@ def generate_rc(qrc_files, verbose):
         >>> generate_rc(["res.qrc", "qrc/another_res.qrc"])
 
     """
-    for qrc_file in qrc_files:
-        # rc file name
-        result_file = os.path.splitext(qrc_file)[0] + "_rc.py"
+    jobs = jobs or os.cpu_count() or 1
 
-        # generate rc file corresponding to qrc file
-        result = subprocess.run(["pyrcc5", qrc_file, "-o", result_file],
-                                stderr=subprocess.PIPE)
+    if split:
+        run = partial(run_split, rc_format=rc_format)
+    elif rc_format == "rcc":
+        run = partial(run_native, rc_format=rc_format)
+    elif backend == "native":
+        run = run_native
+    else:
+        run = run_pyrcc5
 
-        # Case where qrc has no more resources -> can't generate rc file
-        if result.stderr == NO_QRESOURCE:
-            v.warning(
-                ("{} has no more resources and cannot generates its "
-                 "corresponding rc file.").format(qrc_file))
-            continue
-        elif result.stderr.startswith(INVALID_QRC):
-            v.warning("Qrc file: \'{}\' is not valid.".format(qrc_file))
-            continue
-        elif result.stderr:
-            v.warning(result.stderr.decode("utf-8"))
-            continue
+        # Get pyrcc5 version once before processing files concurrently
+        if cache:
+            cache.pyrcc5_version()
+
+    with ThreadPoolExecutor(max_workers=jobs) as executor:
+        results = executor.map(partial(run, cache=cache), qrc_files)
+
+        for qrc_file, (result_file, stderr) in zip(qrc_files, results):
+            # Case where qrc has no more resources -> can't generate rc file
+            if stderr == NO_QRESOURCE:
+                v.warning(
+                    ("{} has no more resources and cannot generates its "
+                     "corresponding rc file.").format(qrc_file))
+                continue
+            elif stderr.startswith(INVALID_QRC):
+                v.warning("Qrc file: \'{}\' is not valid.".format(qrc_file))
+                continue
+            elif stderr:
+                v.warning(stderr.decode("utf-8"))
+                continue
+
+            v.info("Python qrc file '{}' created.".format(result_file),
+                   verbose)
 
-        v.info("Python qrc file '{}' created.".format(result_file), verbose)
+    if cache:
+        cache.evict()
@@ -0,0 +1,193 @@
+"""Module recording the state of resources folders between two updates."""
+
+import os
+import json
+import time
+
+
+class Manifest:
+    """State of the resources folders of each qrc file at their last update.
+
+    For each qrc file, the manifest records the size and modification time of
+    the qrc file itself and, for each of its resources folders, the
+    modification time of every directory with the size and modification time
+    of the files it contains. The modification time of a directory only
+    changes when entries are added or removed in it, so a directory whose
+    modification time didn't change since the last update has not to be
+    listed again.
+
+    Attributes:
+        path (str): Absolute path to the manifest file.
+        _qrcs (dict): Recorded state of each qrc file identified by its name.
+
+    """
+
+    MANIFEST_FILE = ".pyqtclimanifest"
+
+    # Delay in nanoseconds during which a directory modified around the last
+    # scan is listed again, as file systems timestamps can be coarse.
+    RACY_DELAY = 10 ** 9
+
+    def __init__(self, project):
+        self.path = os.path.join(project.root_path, self.MANIFEST_FILE)
+
+        try:
+            with open(self.path, "r") as f:
+                self._qrcs = json.load(f)
+        except (OSError, ValueError):
+            self._qrcs = {}
+
+    def is_known(self, qrc, directory):
+        """Check if the recorded state of a resources folder can be trusted.
+
+        The state of a folder is trusted only if the qrc file has not been
+        modified since its last update, otherwise recorded files could differ
+        from the qrc ones.
+
+        Args:
+            qrc (:class:`pyqtcli.qrc.QRCFile`): Qrc file recording `directory`.
+            directory (str): Path to the resources folder.
+
+        Returns:
+            bool: True if the recorded state of `directory` is trusted.
+
+        """
+        record = self._qrcs.get(qrc.name)
+        if record is None or directory not in record["dirs"]:
+            return False
+
+        try:
+            st = os.stat(qrc.path)
+        except OSError:
+            return False
+
+        return record["qrc"] == [st.st_size, st.st_mtime_ns]
+
+    def scan(self, qrc_name, directory, recursive=True):
+        """Scan a resources folder and record its new state.
+
+        Only directories modified since the last scan are listed.
+
+        Args:
+            qrc_name (str): Name of the qrc file recording `directory`.
+            directory (str): Path to the resources folder.
+            recursive (Optional[bool]): If False only files at the root of
+                `directory` are scanned.
+
+        Returns:
+            tuple: Lists of paths to files added and removed since last scan.
+
+        """
+        record = self._qrcs.setdefault(qrc_name, {"qrc": None, "dirs": {}})
+        old = record["dirs"].get(directory, {"stamp": 0, "tree": {}})
+        stamp = old["stamp"]
+        old_tree = old["tree"]
+
+        new_tree = {}
+        added = []
+        removed = []
+        new_stamp = int(time.time() * 10 ** 9)
+
+        pending = [directory]
+        while pending:
+            path = pending.pop()
+            try:
+                mtime = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            entry = old_tree.get(path)
+
+            # A directory modified in the same time as the last scan could
+            # have been modified after it was listed
+            if entry is None or entry["mtime"] != mtime or \
+                    mtime >= stamp - self.RACY_DELAY:
+                entry = self._list_directory(path, mtime, entry, added,
+                                             removed)
+
+            new_tree[path] = entry
+            if recursive:
+                pending.extend(reversed(
+                    [os.path.join(path, d) for d in entry["dirs"]]))
+
+        # Files within directories that no longer exist have been removed
+        for path, entry in old_tree.items():
+            if path not in new_tree:
+                removed.extend(os.path.join(path, f) for f in entry["files"])
+
+        record["dirs"][directory] = {"stamp": new_stamp, "tree": new_tree}
+
+        return added, removed
+
+    @staticmethod
+    def _list_directory(path, mtime, entry, added, removed):
+        """List a directory and report its files changes since last scan.
+
+        Like :func:`os.walk`, symbolic links to directories aren't entered
+        while symbolic links to files are listed.
+
+        Args:
+            path (str): Path to the directory to list.
+            mtime (int): Modification time of the directory in nanoseconds.
+            entry (dict or None): Recorded state of the directory.
+            added (list): List receiving paths to added files.
+            removed (list): List receiving paths to removed files.
+
+        Returns:
+            dict: New state of the directory.
+
+        """
+        files = {}
+        dirs = []
+        try:
+            dir_entries = list(os.scandir(path))
+        except OSError:
+            dir_entries = []
+
+        for dir_entry in dir_entries:
+            try:
+                if dir_entry.is_dir():
+                    if not dir_entry.is_symlink():
+                        dirs.append(dir_entry.name)
+                    continue
+                st = dir_entry.stat()
+            except OSError:
+                continue
+            files[dir_entry.name] = [st.st_size, st.st_mtime_ns]
+
+        old_files = entry["files"] if entry else {}
+        added.extend(
+            os.path.join(path, f) for f in files if f not in old_files)
+        removed.extend(
+            os.path.join(path, f) for f in old_files if f not in files)
+
+        return {"mtime": mtime, "files": files, "dirs": dirs}
+
+    def forget(self, qrc_name, directory=None):
+        """Remove the recorded state of a resources folder or of a qrc file.
+
+        Args:
+            qrc_name (str): Name of the qrc file.
+            directory (Optional[str]): Path to the resources folder. If None
+                the whole state of the qrc file is removed.
+
+        """
+        if directory is None:
+            self._qrcs.pop(qrc_name, None)
+        elif qrc_name in self._qrcs:
+            self._qrcs[qrc_name]["dirs"].pop(directory, None)
+
+    def record_qrc(self, qrc):
+        """Record size and modification time of a freshly written qrc file.
+
+        Args:
+            qrc (:class:`pyqtcli.qrc.QRCFile`): Updated qrc file.
+
+        """
+        st = os.stat(qrc.path)
+        record = self._qrcs.setdefault(qrc.name, {"qrc": None, "dirs": {}})
+        record["qrc"] = [st.st_size, st.st_mtime_ns]
+
+    def save(self):
+        """Save the manifest file."""
+        with open(self.path, "w") as f:
+            json.dump(self._qrcs, f)
@@ -1,10 +1,17 @@
 """This module enable user to generate qrc file for qt project."""
 
 import os
+import sys
+import heapq
+import bisect
 
 from lxml import etree
+from collections import namedtuple
+from collections import OrderedDict
 
-from pyqtcli.config import find_project_config
+from pyqtcli.utils import walk_tree
+from pyqtcli.utils import walk_directory
+from pyqtcli.config import ProjectContext
 from pyqtcli.exception import QresourceError
 from pyqtcli.exception import QRCFileError
 
@@ -17,22 +24,35 @@ class QRCFile:
             automatically added.
         path (Optional[str]): Absolute ath to new qrc file.
         dir_path (str): Absolute path to the qrc file directory.
+        sort (bool): If True, <file> elements are kept sorted by path within
+            each qresource so that the qrc file doesn't depend on the order
+            resources are found on disk.
         _qresources (list[:class:`etree.SubElement`]): List of qresources
             created.
+        _prefixes (dict): Map each prefix to its first <qresource> element.
+        _files (dict): Map each prefix to a dict associating resource paths
+            to their <file> elements, in document order, within the first
+            qresource of the prefix.
+        _sorted (dict): In sort mode, map each prefix to the sorted lists of
+            paths and <file> elements of its qresource.
         _root (:class:`etree.Element`): Root element of qrc file.
         _tree (:class:`etree.ElementTree`): Qrc tree with added qresources and
             resources.
 
     """
-    def __init__(self, name, path="."):
+    def __init__(self, name, path=".", sort=False):
         self.name = name if os.path.splitext(name)[1] else name + ".qrc"
         self.dir_path = os.path.abspath(path)
         self.path = os.path.join(self.dir_path, self.name)
+        self.sort = sort
         self._qresources = []
+        self._prefixes = {}
+        self._files = {}
+        self._sorted = {}
         self._root = etree.Element("RCC")
         self._tree = etree.ElementTree(self._root)
 
-    def add_qresource(self, prefix=None, folder=None):
+    def add_qresource(self, prefix=None, folder=None, project=None):
         """Create to the qresource subelement.
 
         Create a qresource node in the qrc file. If `folder` is provided,
@@ -44,20 +64,16 @@ class QRCFile:
                 for qresource element.
             folder (Optional[str]): Path to the folder corresponding to the
                 qresource.
+            project (Optional[:class:`ProjectContext`]): Project of the qrc
+                used to record resources of `folder`.
 
         Raises:
             :class:`QresourceError`: Raised when the passed prefix corresponds
                 to an existing <qresource> node in the qrc file.
 
         """
-        # Get qresource node corresponding to the passed prefix
-        try:
-            qresource = self.get_qresource(prefix)
-        except QresourceError:
-            qresource = None
-
         # If a qresource is found -> duplication and so raise error
-        if qresource is not None:
+        if prefix in self._prefixes:
             raise QresourceError((
                 "Error: qresource with prefix: \'{}\' already "
                 "exists").format(prefix)
@@ -70,11 +86,12 @@ class QRCFile:
         else:
             qresource = etree.SubElement(self._root, "qresource")
 
-        if folder:
-            fill_qresource(self, folder, prefix)
+        # Add created element to others before filling it so that its
+        # resources can be looked up by prefix
+        self._index_qresource(qresource)
 
-        # Add created element to others
-        self._qresources.append(qresource)
+        if folder:
+            fill_qresource(self, folder, prefix, project)
 
     def remove_qresource(self, prefix):
         """Remove a qresource and its children from qrc file.
@@ -92,8 +109,19 @@ class QRCFile:
         """
         qresource = self.get_qresource(prefix)
         self._qresources.remove(qresource)
+        del self._prefixes[prefix]
+        del self._files[prefix]
+        self._sorted.pop(prefix, None)
         qresource.getparent().remove(qresource)
 
+        # Another qresource with the same prefix, like one with a different
+        # lang attribute, becomes the one of the prefix
+        for other in self._qresources:
+            if other.attrib.get("prefix", None) == prefix:
+                self._prefixes[prefix] = other
+                self._index_files(other, prefix)
+                break
+
         return qresource
 
     def get_qresource(self, prefix):
@@ -110,9 +138,10 @@ class QRCFile:
                 correspond to any existing <qresource> node in the qrc file.
 
         """
-        for qresource in self._qresources:
-            if qresource.attrib.get("prefix", None) == prefix:
-                return qresource
+        try:
+            return self._prefixes[prefix]
+        except KeyError:
+            pass
 
         raise QresourceError(
             "Error: No <qresource> node corresponding to \'{}\' prefix".format(
@@ -135,7 +164,42 @@ class QRCFile:
         qresource = self.get_qresource(prefix)
 
         # Add the resource to qresource element
-        etree.SubElement(qresource, "file",).text = resource
+        if self.sort:
+            res = etree.Element("file")
+            res.text = resource
+            self._insert_sorted(qresource, prefix, res)
+        else:
+            res = etree.SubElement(qresource, "file",)
+            res.text = resource
+        self._files[prefix].setdefault(resource, []).append(res)
+
+    def add_files(self, resources, prefix):
+        """Add resources to a given prefix, looking up its qresource once.
+
+        In sort mode, resources are sorted and then merged with the recorded
+        ones in a single pass.
+
+        Args:
+            resources (iterable): Paths to the resources.
+            prefix (str): Prefix attribute like => "/" for qresource element.
+
+        Raises:
+            :class:`QresourceError`: Raised when the passed prefix doesn't
+                correspond to any existing <qresource> node in the qrc file.
+
+        """
+        qresource = self.get_qresource(prefix)
+        files = self._files[prefix]
+
+        added = []
+        for resource in resources:
+            res = etree.SubElement(qresource, "file")
+            res.text = resource
+            files.setdefault(resource, []).append(res)
+            added.append(res)
+
+        if self.sort and added:
+            self._merge_sorted(qresource, prefix, added)
 
     def remove_resource(self, resource, prefix):
         """
@@ -164,9 +228,59 @@ class QRCFile:
 
         # Remove the resource from qresource element
         qresource.remove(res)
+        self._forget_file(prefix, res)
+        self._forget_sorted(prefix, res)
 
         return res
 
+    def remove_resources(self, resources, prefix):
+        """Remove <file> nodes matching resources from a qresource.
+
+        Children of the qresource are scanned once and all <file> nodes of
+        the given resources are removed, duplicates included. Nothing is
+        removed if one of the resources isn't recorded.
+
+        Args:
+            resources (iterable): Paths to the resources.
+            prefix (str): Prefix attribute like => "/" for qresource element.
+
+        Returns:
+            list: Removed <file> elements.
+
+        Raises:
+            :class:`QresourceError`: Raised when
+                - `prefix` doesn't correspond to any existing <qresource>
+                    node in the qrc file.
+                - No <file> element correspond to one of `resources`.
+
+        """
+        qresource = self.get_qresource(prefix)
+        files = self._files[prefix]
+
+        resources = set(resources)
+        if not resources:
+            return []
+
+        for resource in resources:
+            if resource not in files:
+                raise QresourceError(
+                    ("Error: No <file> child corresponding to \'{}\' in "
+                     "qresource \'{}\'").format(resource, prefix))
+
+        removed = [res for res in qresource.iter(tag="file")
+                   if res.text in resources]
+        for res in removed:
+            qresource.remove(res)
+        for resource in resources:
+            del files[resource]
+
+        if prefix in self._sorted:
+            self._sorted[prefix] = _sorted_files(
+                res for res in self._sorted[prefix][1]
+                if res.text not in resources)
+
+        return removed
+
     def remove_file(self, resource, prefix):
         """
         Remove a <file> node matching `resource` from a qresource
@@ -192,6 +306,9 @@ class QRCFile:
         # Remove the resource from qresource element
         qresource.remove(resource)
 
+        self._forget_file(prefix, resource)
+        self._forget_sorted(prefix, resource)
+
         return resource
 
     def get_file(self, resource, prefix):
@@ -213,11 +330,12 @@ class QRCFile:
 
         """
         # Get qresource node corresponding to the passed prefix
-        qresource = self.get_qresource(prefix)
+        self.get_qresource(prefix)
 
-        for res in qresource.iter(tag="file"):
-            if res.text == resource:
-                return res
+        try:
+            return self._files[prefix][resource][0]
+        except KeyError:
+            pass
 
         raise QresourceError(
             ("Error: No <file> child corresponding to \'{}\' in "
@@ -277,17 +395,142 @@ class QRCFile:
                     files.append(resource)
             return files
 
+    def _index_qresource(self, qresource):
+        """Record a <qresource> element and its <file> children in indexes.
+
+        Args:
+            qresource (:class:`etree.Element`): <qresource> element to record.
+
+        """
+        prefix = qresource.attrib.get("prefix", None)
+
+        self._qresources.append(qresource)
+
+        if self.sort:
+            # Sort resources once, they are then inserted at their place
+            for res in _sorted_files(qresource.iter(tag="file"))[1]:
+                qresource.append(res)
+
+        # Only the first qresource of a prefix is looked up
+        if self._prefixes.setdefault(prefix, qresource) is qresource:
+            self._index_files(qresource, prefix)
+
+    def _index_files(self, qresource, prefix):
+        """Record <file> children of the qresource of a prefix in indexes.
+
+        Args:
+            qresource (:class:`etree.Element`): Qresource of `prefix`.
+            prefix (str): Prefix attribute like => "/" for qresource element.
+
+        """
+        files = self._files[prefix] = {}
+        for res in qresource.iter(tag="file"):
+            files.setdefault(res.text, []).append(res)
+
+        if self.sort:
+            self._sorted[prefix] = _sorted_files(qresource.iter(tag="file"))
+
+    def _forget_file(self, prefix, res):
+        """Remove a <file> element from the index of a prefix.
+
+        Args:
+            prefix (str): Prefix attribute like => "/" for qresource element.
+            res (:class:`etree.Element`): Removed <file> element.
+
+        """
+        files = self._files[prefix]
+        elements = files.get(res.text, [])
+        for i, element in enumerate(elements):
+            if element is res:
+                del elements[i]
+                break
+
+        # Duplicates of the resource are still found
+        if not elements:
+            files.pop(res.text, None)
+
+    def _insert_sorted(self, qresource, prefix, res):
+        """Insert a <file> element at its place in a sorted qresource.
+
+        Args:
+            qresource (:class:`etree.Element`): Qresource of `prefix`.
+            prefix (str): Prefix attribute like => "/" for qresource element.
+            res (:class:`etree.Element`): <file> element to insert.
+
+        """
+        paths, elements = self._sorted[prefix]
+        path = res.text or ""
+
+        # Equal paths keep their insertion order
+        i = bisect.bisect_right(paths, path)
+        if i < len(elements):
+            elements[i].addprevious(res)
+        else:
+            qresource.append(res)
+
+        paths.insert(i, path)
+        elements.insert(i, res)
+
+    def _merge_sorted(self, qresource, prefix, added):
+        """Merge <file> elements appended to a sorted qresource.
+
+        Args:
+            qresource (:class:`etree.Element`): Qresource of `prefix`.
+            prefix (str): Prefix attribute like => "/" for qresource element.
+            added (list): <file> elements appended to `qresource`.
+
+        """
+        paths, elements = self._sorted[prefix]
+        new_paths, new_elements = _sorted_files(added)
+
+        merged = list(heapq.merge(zip(paths, elements),
+                                  zip(new_paths, new_elements),
+                                  key=lambda item: item[0]))
+        for _, res in merged:
+            qresource.append(res)
+
+        self._sorted[prefix] = ([path for path, _ in merged],
+                                [res for _, res in merged])
+
+    def _forget_sorted(self, prefix, res):
+        """Remove a <file> element from the sorted ones of a prefix.
+
+        Args:
+            prefix (str): Prefix attribute like => "/" for qresource element.
+            res (:class:`etree.Element`): Removed <file> element.
+
+        """
+        if prefix not in self._sorted:
+            return
+
+        paths, elements = self._sorted[prefix]
+        i = bisect.bisect_left(paths, res.text or "")
+        while i < len(elements) and elements[i] is not res:
+            i += 1
+
+        if i < len(elements):
+            del paths[i]
+            del elements[i]
+
     def build(self):
-        """Generate qrc file in function with path and name attributes."""
+        """Generate qrc file in function with path and name attributes.
+
+        The tree is serialized chunk by chunk to a temporary file while being
+        compared with the current qrc file. The temporary file then replaces
+        the qrc file, unless their contents are identical: the qrc file is
+        then left untouched so that its modification time doesn't trigger
+        rebuilds.
+
+        Returns:
+            bool: True if the qrc file was written.
+
+        """
         # Create directories for qrc file if not exist
         if not os.path.isdir(self.dir_path):
             os.makedirs(self.dir_path)
 
         # Write qrc file
-        with open(self.path, "w") as f:
-            f.write(etree.tostring(
-                self._tree, pretty_print=True).decode('utf-8')
-            )
+        return write_tree(self._tree, self.path)
 
     def __str__(self):
         return etree.tostring(self._root, pretty_print=True).decode("utf-8")
@@ -305,11 +548,359 @@ class QRCFile:
         return self._qresources
 
 
-def read_qrc(qrc):
+def _sorted_files(files):
+    """Sort <file> elements by path, keeping the order of equal paths.
+
+    Args:
+        files (iterable): <file> elements.
+
+    Returns:
+        tuple: Sorted lists of paths and of <file> elements.
+
+    """
+    elements = sorted(files, key=lambda res: res.text or "")
+    return [res.text or "" for res in elements], elements
+
+
+def write_tree(tree, path, pretty_print=True):
+    """Write an xml tree to a file through a temporary file.
+
+    The tree is serialized chunk by chunk to a temporary file while being
+    compared with the current file. The temporary file then replaces it,
+    unless their contents are identical: the file is then left untouched.
+
+    Args:
+        tree (:class:`etree.ElementTree`): Tree to write.
+        path (str): Path to the written file.
+        pretty_print (Optional[bool]): If True, the tree is indented.
+
+    Returns:
+        bool: True if the file was written.
+
+    """
+    tmp_file = "{}.{}.tmp".format(path, os.getpid())
+    try:
+        with open(tmp_file, "wb") as f:
+            writer = _ComparingWriter(f, path)
+            try:
+                tree.write(writer, pretty_print=pretty_print)
+                unchanged = writer.unchanged()
+            finally:
+                writer.close()
+
+        if unchanged:
+            os.remove(tmp_file)
+        else:
+            os.replace(tmp_file, path)
+    except BaseException:
+        if os.path.isfile(tmp_file):
+            os.remove(tmp_file)
+        raise
+
+    return not unchanged
+
+
+class _ComparingWriter:
+    """Write chunks to a file while comparing them to another file.
+
+    Attributes:
+        output (file): Binary file receiving chunks.
+        _current (file): Compared binary file, None if it doesn't exist or
+            once a difference is found.
+
+    """
+
+    def __init__(self, output, path):
+        self.output = output
+        try:
+            self._current = open(path, "rb")
+        except OSError:
+            self._current = None
+
+    def write(self, data):
+        self.output.write(data)
+        if self._current is not None and self._current.read(len(data)) != data:
+            self.close()
+
+    def unchanged(self):
+        """Check if written chunks are the whole content of compared file."""
+        return self._current is not None and self._current.read(1) == b""
+
+    def close(self):
+        """Stop the comparison."""
+        if self._current is not None:
+            self._current.close()
+            self._current = None
+
+
+# Resource recorded in a qrc file index
+QRCEntry = namedtuple("QRCEntry", ["path", "alias"])
+
+
+class QResourceModel:
+    """Compact record of a <qresource> element and its resources.
+
+    Resources are stored in parallel lists instead of elements. Attributes
+    other than prefix, lang and alias are rare and only recorded when set.
+
+    Attributes:
+        prefix (str): Prefix of the qresource, None if it has none.
+        lang (str): Language of the qresource, None if it has none.
+        paths (list): Paths of the resources.
+        aliases (list): Alias of each resource, None if it has none.
+        attributes (dict): Other attributes of the qresource, None if it has
+            none.
+        file_attributes (dict): Map the position of resources having other
+            attributes than alias to them, None if no resource has any.
+
+    """
+
+    __slots__ = ("prefix", "lang", "paths", "aliases", "attributes",
+                 "file_attributes")
+
+    def __init__(self, prefix=None, lang=None, attributes=None):
+        self.prefix = None if prefix is None else sys.intern(prefix)
+        self.lang = None if lang is None else sys.intern(lang)
+        self.paths = []
+        self.aliases = []
+        self.attributes = attributes or None
+        self.file_attributes = None
+
+    def add(self, path, alias=None, attributes=None):
+        """Record a resource.
+
+        Args:
+            path (str): Path to the resource.
+            alias (Optional[str]): Alias of the resource.
+            attributes (Optional[dict]): Other attributes of its <file>
+                element.
+
+        """
+        if attributes:
+            if self.file_attributes is None:
+                self.file_attributes = {}
+            self.file_attributes[len(self.paths)] = attributes
+
+        self.paths.append(path)
+        self.aliases.append(alias)
+
+    def __len__(self):
+        return len(self.paths)
+
+    def __iter__(self):
+        return map(QRCEntry, self.paths, self.aliases)
+
+
+class QRCModel:
+    """Compact in-memory model of a qrc file independent of lxml elements.
+
+    Use it for commands analysing many resources, and :class:`QRCFile` to
+    modify qrc files. Models are converted from and to lxml trees by
+    :meth:`from_tree` and :meth:`to_tree`. The doctype isn't recorded.
+
+    Attributes:
+        qresources (list[:class:`QResourceModel`]): Qresources in the order
+            of the qrc file.
+        attributes (dict): Attributes of the <RCC> element, None if it has
+            none.
+
+    """
+
+    __slots__ = ("qresources", "attributes")
+
+    def __init__(self, attributes=None):
+        self.qresources = []
+        self.attributes = attributes or None
+
+    @classmethod
+    def from_tree(cls, tree):
+        """Record a qrc tree.
+
+        Args:
+            tree (:class:`etree.ElementTree`): Tree of a qrc file, e.g.
+                :attr:`QRCFile.tree`.
+
+        Returns:
+            :class:`QRCModel`: Model of the tree.
+
+        """
+        root = tree.getroot()
+        model = cls(_other_attributes(root))
+
+        for element in root.iter(tag="qresource"):
+            qresource = QResourceModel(
+                element.get("prefix"), element.get("lang"),
+                _other_attributes(element, ("prefix", "lang")))
+            for res in element.iter(tag="file"):
+                qresource.add(res.text, res.get("alias"),
+                              _other_attributes(res, ("alias",)))
+            model.qresources.append(qresource)
+
+        return model
+
+    def to_tree(self):
+        """Build the lxml tree of the model.
+
+        Returns:
+            :class:`etree.ElementTree`: Tree as generated by
+                :class:`QRCFile`.
+
+        """
+        root = etree.Element("RCC", self.attributes)
+
+        for qresource in self.qresources:
+            attrib = OrderedDict()
+            if qresource.prefix is not None:
+                attrib["prefix"] = qresource.prefix
+            if qresource.lang is not None:
+                attrib["lang"] = qresource.lang
+            attrib.update(qresource.attributes or {})
+            element = etree.SubElement(root, "qresource", attrib)
+
+            file_attributes = qresource.file_attributes or {}
+            for i, (path, alias) in enumerate(qresource):
+                attrib = OrderedDict()
+                if alias is not None:
+                    attrib["alias"] = alias
+                attrib.update(file_attributes.get(i, {}))
+                etree.SubElement(element, "file", attrib).text = path
+
+        return etree.ElementTree(root)
+
+    def resources(self, prefix=None):
+        """Iterate over resources without building lists.
+
+        Args:
+            prefix (Optional[str]): Only iterate over resources of qresources
+                with this prefix.
+
+        Yields:
+            :class:`QRCEntry`: Path and alias of each resource.
+
+        """
+        for qresource in self.qresources:
+            if prefix is None or qresource.prefix == prefix:
+                yield from qresource
+
+    def index(self):
+        """Group resources by prefix.
+
+        Returns:
+            OrderedDict: Map each prefix, None for <qresource> elements
+                without one, to a tuple of :class:`QRCEntry`.
+
+        """
+        index = OrderedDict()
+        for qresource in self.qresources:
+            index.setdefault(qresource.prefix, []).extend(qresource)
+
+        return OrderedDict((prefix, tuple(entries))
+                           for prefix, entries in index.items())
+
+
+def _other_attributes(element, known=()):
+    """Return attributes of an element not recorded by dedicated fields."""
+    return OrderedDict((name, value) for name, value in element.attrib.items()
+                       if name not in known) or None
+
+
+class _ModelTarget:
+    """Parser target recording a qrc file in a model without any tree.
+
+    Attributes:
+        model (:class:`QRCModel`): Model of the parsed qrc file.
+        _qresource (:class:`QResourceModel`): Qresource being parsed.
+        _attrib (dict): Attributes of the <file> being parsed.
+        _text (list): Text chunks of the <file> being parsed, None outside
+            of <file> elements.
+
+    """
+
+    def __init__(self):
+        self.model = QRCModel()
+        self._qresource = None
+        self._attrib = None
+        self._text = None
+
+    def start(self, tag, attrib):
+        if tag == "RCC":
+            self.model.attributes = OrderedDict(attrib) or None
+        elif tag == "qresource":
+            attrib = OrderedDict(attrib)
+            self._qresource = QResourceModel(
+                attrib.pop("prefix", None), attrib.pop("lang", None), attrib)
+            self.model.qresources.append(self._qresource)
+        elif tag == "file" and self._qresource is not None:
+            self._attrib = OrderedDict(attrib)
+            self._text = []
+
+    def data(self, data):
+        if self._text is not None:
+            self._text.append(data)
+
+    def end(self, tag):
+        if tag == "qresource":
+            self._qresource = None
+        elif tag == "file" and self._text is not None:
+            alias = self._attrib.pop("alias", None)
+            self._qresource.add("".join(self._text) or None, alias,
+                                self._attrib)
+            self._text = None
+
+    def close(self):
+        return self.model
+
+
+def read_qrc_model(qrc):
+    """Read a qrc file in a compact model without building its tree.
+
+    Resources are recorded while the qrc file is parsed, so commands only
+    reading it don't keep elements in memory. Use :func:`read_qrc` to modify
+    the qrc file.
+
+    Args:
+        qrc (str): Path to the qrc file.
+
+    Returns:
+        :class:`QRCModel`: Model of the qrc file.
+
+    Raises:
+        :class:`QRCFileError`: Raised when passed qrc file does not exist.
+        :class:`etree.XMLSyntaxError`: Raised when the qrc file isn't valid.
+
+    """
+    if not os.path.isfile(qrc):
+        raise QRCFileError(
+            "Error: Qrc file \'{}\' does not exist.".format(qrc))
+
+    return etree.parse(qrc, etree.XMLParser(target=_ModelTarget()))
+
+
+def read_qrc_index(qrc):
+    """Read prefixes and resources of a qrc file without building its tree.
+
+    Args:
+        qrc (str): Path to the qrc file.
+
+    Returns:
+        OrderedDict: Map each prefix, None for <qresource> elements without
+            one, to a tuple of :class:`QRCEntry` in the order of the qrc file.
+
+    Raises:
+        :class:`QRCFileError`: Raised when passed qrc file does not exist.
+        :class:`etree.XMLSyntaxError`: Raised when the qrc file isn't valid.
+
+    """
+    return read_qrc_model(qrc).index()
+
+
+def read_qrc(qrc, sort=False):
     """Parse a qrc file to return a QRCFile object.
 
     Args:
         qrc (str): Path to the qrc file.
+        sort (Optional[bool]): If True, <file> elements are sorted by path
+            within each qresource and kept sorted.
 
     Returns:
         :class:`QRCFile`: :class:`QRCFile` representing passed qrc file.
@@ -322,19 +913,19 @@ def read_qrc(qrc):
         raise QRCFileError("Error: Qrc file \'{}\' does not exist.".format(qrc))
 
     path, name = os.path.split(qrc)
-    qrcfile = QRCFile(name, path)
+    qrcfile = QRCFile(name, path, sort)
 
     parser = etree.XMLParser(remove_blank_text=True)
     qrcfile._tree = etree.parse(qrc, parser)
     qrcfile._root = qrcfile.tree.getroot()
 
     for qresource in qrcfile.root.iter(tag="qresource"):
-        qrcfile.qresources.append(qresource)
+        qrcfile._index_qresource(qresource)
 
     return qrcfile
 
 
-def fill_qresource(qrc, folder, prefix):
+def fill_qresource(qrc, folder, prefix, project=None, workers=1):
     """Fill a qrc with resources contained in the passed folder.
 
     Each file of resource folder will be record as <file> subelement of the
@@ -346,32 +937,33 @@ def fill_qresource(qrc, folder, prefix):
         qrc (:class:`QRCFile`): A QRCFile object to add and fill qresource.
         folder (str): Path to the folder of resources to record.
         prefix (str): <qresource>'s prefix in which add the <file>.
+        project (Optional[:class:`ProjectContext`]): Project of the qrc. It is
+            searched from the current directory if not given.
+        workers (Optional[int]): Number of threads walking subdirectories of
+            `folder`.
 
     """
+    if project is None:
+        project = ProjectContext.find()
+
     # In case where the prefix is root, only files in root of the folder
     # will be recorded as <file> subelement.
     if prefix == "/":
-        for resource in os.listdir(folder):
-            if os.path.isfile(os.path.join(folder, resource)):
-                # Relative path between qrc file and the project directory
-                path = os.path.relpath(os.path.join(folder, resource),
-                                       os.path.dirname(find_project_config()))
-                qrc.add_file(path, prefix)
-        return
-
-    # Otherwise all files are recorded recursively
-    for root, dirs, files in os.walk(folder):
-        for resource in files:
-            resource_path = os.path.join(root, resource)
-
-            # Relative path between qrc file and the project directory
-            path = os.path.relpath(
-                    resource_path, os.path.dirname(find_project_config()))
+        resources = (os.path.join(folder, resource)
+                     for resource in os.listdir(folder))
+        resources = (path for path in resources if os.path.isfile(path))
+    else:
+        # Otherwise all files are recorded recursively
+        resources = (os.path.join(root, resource)
+                     for root, dirs, files in walk_directory(folder, workers)
+                     for resource in files)
 
-            qrc.add_file(path, prefix)
+    # Relative path between qrc file and the project directory
+    qrc.add_files((os.path.relpath(path, project.root_path)
+                   for path in resources), prefix)
 
 
-def generate_qrc(qrc, res_folder, build=True):
+def generate_qrc(qrc, res_folder, build=True, workers=1):
     """Generate qrc file with provided folder of resources. The root of the
     resources folder correspond to qresource with "/" prefix. Resources that are
     not in folders will be recorded a <file> subelement to "/" qresource.
@@ -383,23 +975,29 @@ def generate_qrc(qrc, res_folder, build=True):
         qrc (:class:`QRCFile`): A newly created QRCFile.
         res_folder (str): Path to the folder of resources.
         build (Optional[bool]): If True `QRCFile` object is save into qrc file.
+        workers (Optional[int]): Number of threads walking directories of the
+            resources folder, each one serving as qresource.
 
     """
-    # Loop over the folder of resources
-    for root, dirs, files in os.walk(res_folder):
-        if root == res_folder:
-            qrc.add_qresource("/")
-            # Directories in the first level will serve as qresource
-            for directory in dirs:
-                qrc.add_qresource("/" + directory)
-
-        # Record all resources recursively
-        for resource in files:
-            try:
-                prefix = "/" + root.replace(res_folder, "").split("/")[1]
-            except IndexError:
-                prefix = "/"
-            qrc.add_file(os.path.join(root, resource), prefix)
+    top_entry, walks = walk_tree(res_folder, workers)
+    if top_entry is None:
+        return
+
+    # Resources in the root of the folder are recorded in "/" qresource
+    root, dirs, files = top_entry
+    qrc.add_qresource("/")
+    qrc.add_files((os.path.join(root, resource) for resource in files), "/")
+
+    # Directories in the first level will serve as qresource
+    for directory in (sorted(dirs) if qrc.sort else dirs):
+        qrc.add_qresource("/" + directory)
+
+    # Record all resources of a directory recursively with its prefix
+    for directory, walk in walks:
+        prefix = "/" + directory
+        for root, _, files in walk:
+            qrc.add_files(
+                (os.path.join(root, resource) for resource in files), prefix)
 
     # Write qrc file
     if build:
@@ -0,0 +1,41 @@
+import os
+import time
+
+
+# Benchmarks sizes are multiplied by this factor. Set PYQTCLI_BENCH_SCALE=1 to
+# run them with the sizes given in their description.
+BENCH_SCALE = float(os.environ.get("PYQTCLI_BENCH_SCALE", "0.1"))
+
+
+def scaled(size, minimum=100):
+    """Scale a benchmark size with the PYQTCLI_BENCH_SCALE factor.
+
+    Args:
+        size (int): Size of the benchmark at full scale.
+        minimum (Optional[int]): Minimal size returned.
+
+    Returns:
+        int: Scaled size.
+
+    """
+    return max(minimum, int(size * BENCH_SCALE))
+
+
+def timeit(func, *args, repeat=3, **kwargs):
+    """Return the best execution time of a function call.
+
+    Args:
+        func (callable): Function to time.
+        repeat (Optional[int]): Number of calls to do.
+
+    Returns:
+        float: Best execution time in seconds.
+
+    """
+    best = float("inf")
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func(*args, **kwargs)
+        best = min(best, time.perf_counter() - start)
+
+    return best
@@ -1,6 +1,5 @@
 import os
 
-from lxml import etree
 from functools import wraps
 
 from pyqtcli.qrc import QRCFile
@@ -73,11 +72,9 @@ class QRCTestFile(QRCFile, GenerativeBase):
         """
         # Add the resource to qresource element corresponding to prefix or
         # the last prefix used
-        if prefix:
-            qresource = self.get_qresource(prefix)
-            etree.SubElement(qresource, "file",).text = resource
-        else:
-            etree.SubElement(self._last_qresource, "file",).text = resource
+        if not prefix:
+            prefix = self._last_qresource.attrib.get("prefix", None)
+        super().add_file(resource, prefix)
 
         # Create directories of the resource if not exists
         dir_name = os.path.join(
@@ -0,0 +1,59 @@
+import zlib
+
+
+def read_rcc(path):
+    """Read resources of a binary resource file following Qt rcc format.
+
+    The file starts with the "qres" magic number followed by the format
+    version and the offsets of the tree, data and names sections as
+    big-endian 32 bits integers. Each tree entry starts with the offset of
+    its name and its flags. Directories then hold the number of their
+    children and the index of the first one, files their country, language
+    and data offset. Entries are 22 bytes long from version 2 which adds a
+    last modification date. Names hold their length in UTF-16 characters,
+    their hash and their characters. Data hold their size followed by their
+    content, compressed with qCompress when flagged.
+
+    Args:
+        path (str): Path to the rcc file.
+
+    Returns:
+        dict: Map resource paths like ":/images/icon.png" to their content.
+
+    """
+    with open(path, "rb") as f:
+        rcc = f.read()
+
+    def number(offset, size=4):
+        return int.from_bytes(rcc[offset:offset + size], "big")
+
+    assert rcc[:4] == b"qres"
+    version = number(4)
+    tree, data, names = number(8), number(12), number(16)
+    assert version in (1, 2)
+    entry_size = 22 if version >= 2 else 14
+
+    def name(entry):
+        offset = names + number(entry)
+        length = number(offset, 2)
+        return rcc[offset + 6:offset + 6 + 2 * length].decode("utf-16-be")
+
+    resources = {}
+    pending = [(tree, ":")]
+    while pending:
+        entry, path = pending.pop()
+        flags = number(entry + 4, 2)
+
+        if flags & 0x02:
+            count, child = number(entry + 6), number(entry + 10)
+            for i in range(child, child + count):
+                child_entry = tree + i * entry_size
+                pending.append((child_entry, path + "/" + name(child_entry)))
+        else:
+            offset = data + number(entry + 10)
+            content = rcc[offset + 4:offset + 4 + number(offset)]
+            if flags & 0x01:
+                content = zlib.decompress(content[4:])
+            resources[path] = content
+
+    return resources
@@ -2,102 +2,238 @@
 
 import os
 
+from collections import OrderedDict
+
 from pyqtcli import verbose as v
 from pyqtcli.cli import read_qrc
 from pyqtcli.qrc import get_prefix_update
-from pyqtcli.config import find_project_config
+from pyqtcli.manifest import Manifest
+
+
+def diff_resources(present, recorded):
+    """Compute changes turning recorded resources into present ones.
+
+    Args:
+        present (list): Paths to the files of a resources folder.
+        recorded (list): Paths to the resources recorded in a qresource.
+
+    Returns:
+        tuple: Lists of paths to resources to add, without duplicates, and
+            to remove, in the order of `present` and `recorded`.
+
+    """
+    # Paths present several times are only added once
+    present = OrderedDict.fromkeys(present)
+    recorded_set = set(recorded)
+
+    added = [res for res in present if res not in recorded_set]
+    removed = [res for res in recorded if res not in present]
+
+    return added, removed
+
+
+class UpdatePlan:
+    """Changes to apply to a qrc file to reflect its resources folders.
+
+    Attributes:
+        qrc_file (str): Path to the qrc file.
+        qrc (:class:`pyqtcli.qrc.QRCFile`): Qrc file to update.
+        vanished (list): Tuples of path and prefix of recorded resources
+            folders which no longer exist.
+        changes (list): Tuples of prefix, resources to add and resources to
+            remove for each modified resources folder.
+
+    """
+
+    def __init__(self, qrc_file, qrc):
+        self.qrc_file = qrc_file
+        self.qrc = qrc
+        self.vanished = []
+        self.changes = []
+
+    @property
+    def added(self):
+        """int: Number of resources to add."""
+        return sum(len(added) for _, added, _ in self.changes)
+
+    @property
+    def removed(self):
+        """int: Number of resources to remove."""
+        return sum(len(removed) for _, _, removed in self.changes)
+
+    def __bool__(self):
+        return bool(self.vanished or self.changes)
+
+
+def plan_update(qrc_file, config, manifest):
+    """Compute changes of a qrc file without modifying it.
+
+    Resources folders are scanned through the manifest, whose new state is
+    only written to disk when the manifest is saved.
+
+    Args:
+        qrc_file (str): Path to the qrc file.
+        config (:class:`pyqtcli.config.PyqtcliConfig`): Project config file.
+        manifest (:class:`pyqtcli.manifest.Manifest`): Project manifest.
+
+    Returns:
+        :class:`UpdatePlan`: Changes of the qrc file.
+
+    """
+    qrc = read_qrc(qrc_file, config.sort_resources)  # qrc file to update
+    plan = UpdatePlan(qrc_file, qrc)
+
+    # Resources folders recorded in qrc
+    for res_dir in config.get_dirs(qrc.name):
+        if os.path.abspath(res_dir) == config.project.root_path:
+            v.warning("Can't update automatically a qrc file where "
+                      "resources are in the same directory as the project "
+                      "one.")
+            continue
+
+        # prefix identify qresource in qrc file
+        prefix = get_prefix_update(res_dir)
+
+        # The recorded directory no longer exists
+        if not os.path.isdir(res_dir):
+            plan.vanished.append((res_dir, prefix))
+            continue
+
+        # Get files added or removed from the folder of resources since
+        # the last update. If the qrc file has been modified since, the
+        # recorded state of the folder can't be trusted and all its files
+        # are compared to the qrc ones.
+        known = manifest.is_known(qrc, res_dir)
+        if not known:
+            manifest.forget(qrc.name, res_dir)
+
+        # In case where the prefix is root, only files in root of the
+        # folder are recorded
+        added, removed = manifest.scan(qrc.name, res_dir, prefix != "/")
+
+        if not known:
+            # All files of the folder were listed, compare them to the
+            # qrc ones to report file addition or deletion in qrc file
+            added, removed = diff_resources(added, qrc.list_resources(prefix))
 
+        if added or removed:
+            plan.changes.append((prefix, added, removed))
 
-def update_project(qrc_files, config, verbose):
+    return plan
+
+
+def apply_update(plan, config, manifest, verbose):
+    """Apply changes of a qrc file and write it once.
+
+    Args:
+        plan (:class:`UpdatePlan`): Changes of the qrc file.
+        config (:class:`pyqtcli.config.PyqtcliConfig`): Project config file.
+        manifest (:class:`pyqtcli.manifest.Manifest`): Project manifest.
+        verbose (bool): If True display information about the process
+
+    Returns:
+        bool: True if the qrc file was written.
+
+    """
+    qrc, qrc_file = plan.qrc, plan.qrc_file
+
+    # Remove vanished directories from dirs variable in config file. Their
+    # corresponding qresource in qrc file is deleted with its <file> children
+    for res_dir, prefix in plan.vanished:
+        config.rm_dirs(qrc.name, res_dir, commit=False)
+        manifest.forget(qrc.name, res_dir)
+        qrc.remove_qresource(prefix)
+
+        v.info(
+            ("The resource folder {} has been manually removed.\n"
+             "It's resources are removed from {} and deleted "
+             "from .pyqtclirc").format(res_dir, qrc_file), verbose
+        )
+
+    for prefix, added, removed in plan.changes:
+        qrc.add_files(added, prefix)
+        for resource in added:
+            v.info("{} added to {}".format(resource, qrc_file), verbose)
+
+        # Resources deleted manually are removed from qrc
+        qrc.remove_resources(removed, prefix)
+        for res in removed:
+            v.info(
+                ("The resource \'{}\' has been manually deleted and so"
+                 " removed from {}").format(res, qrc_file), verbose)
+
+    # Save modifications to qrc file
+    written = qrc.build()
+    manifest.record_qrc(qrc)
+
+    return written
+
+
+def report_update(plan, verbose):
+    """Display changes of a qrc file without applying them.
+
+    Args:
+        plan (:class:`UpdatePlan`): Changes of the qrc file.
+        verbose (bool): If True each change is displayed, otherwise only
+            their number.
+
+    """
+    if not plan:
+        v.info("{} is up to date".format(plan.qrc_file))
+        return
+
+    v.info("{} would be updated: {} resources folders removed, {} resources "
+           "added and {} removed".format(plan.qrc_file, len(plan.vanished),
+                                         plan.added, plan.removed))
+
+    for res_dir, _ in plan.vanished:
+        v.info("The resource folder {} would be removed".format(res_dir),
+               verbose)
+
+    for _, added, removed in plan.changes:
+        for resource in added:
+            v.info("{} would be added".format(resource), verbose)
+        for resource in removed:
+            v.info("{} would be removed".format(resource), verbose)
+
+
+def update_project(qrc_files, config, verbose, dry_run=False):
     """Update given qrc files through information stored in the config file.
 
+    The state of resources folders is recorded in the project manifest so that
+    next updates only list directories modified in the meantime. Changes of a
+    qrc file are all planned before being applied, so that each qrc file and
+    the config file are written once.
+
     Args:
         qrc_files (list or tuple): list of paths to qrc files.
         config (:class:`pyqtcli.config.PyqtcliConfig`): Project config file.
         verbose (bool): If True display information about the process
+        dry_run (Optional[bool]): If True, changes are displayed and nothing
+            is written.
+
+    Returns:
+        list: Paths to the qrc files which were modified.
 
     """
+    manifest = Manifest(config.project)
+    modified = []
+    vanished = False
+
     for qrc_file in qrc_files:
-        qrc = read_qrc(qrc_file)          # qrc file to update
-        dirs = config.get_dirs(qrc.name)  # resources folders recorded in qrc
-
-        for res_dir in dirs:
-            if os.path.abspath(res_dir) == os.path.dirname(
-                    find_project_config()):
-                v.warning("Can't update automatically a qrc file where "
-                          "resources are in the same directory as the project "
-                          "one.")
-                continue
-
-            # prefix identify qresource in qrc file
-            prefix = get_prefix_update(res_dir)
-
-            # Verify the recorded directory still exist and otherwise remove
-            # it from dirs variable in config file. It's corresponding in qrc
-            # file is deleted with its <file> children
-            if not os.path.isdir(res_dir):
-                config.rm_dirs(qrc.name, res_dir)
-                qrc.remove_qresource(prefix)
-                qrc.build()
-
-                v.info(
-                    ("The resource folder {} has been manually removed.\n"
-                     "It's resources are removed from {} and deleted "
-                     "from .pyqtclirc").format(res_dir, qrc_file), verbose
-                )
-                continue
-
-            # Loop over the folder of resources to check file addition or
-            # deletion to report in qrc file
-            resources = qrc.list_resources(prefix)
-            if prefix == "/":
-                # list of resources at the root
-                res = []
-                for path in os.listdir(res_dir):
-                    if os.path.isfile(os.path.join(res_dir, path)):
-                        res.append(path)
-
-                new_qresource_dirs = [r for r in res if r not in dirs]
-                for resource in res:
-                    # A new folder in the root of resources folder as been added
-                    resource = os.path.join(res_dir, resource)
-                    if os.path.isdir(os.path.join(res_dir, resource)) and \
-                            resource in new_qresource_dirs:
-                        qrc.add_qresource(
-                            get_prefix_update(os.path.join(res_dir, resource)),
-                            res_dir
-                        )
-                        v.info("{} added to {} as {}".format(
-                                res_dir, qrc_file, prefix), verbose)
-                    else:
-                        # Add the resource if not recorded
-                        if resource not in resources:
-                            qrc.add_file(resource, prefix)
-                            v.info("{} added to {}".format(resource, qrc_file),
-                                   verbose)
-                        # Remove the resource if it's recorded
-                        elif resource in resources:
-                            resources.remove(resource)
-            else:
-                for root, dirs, files in os.walk(res_dir):
-                    for resource in files:
-                        resource = os.path.join(root, resource)
-                        # Add the resource if not recorded
-                        if resource not in resources:
-                            qrc.add_file(resource, prefix)
-                            v.info("{} added to {}".format(resource, qrc_file),
-                                   verbose)
-                        # Remove the resource if it's recorded
-                        elif resource in resources:
-                            resources.remove(resource)
-
-            # Remaining resources in resources variable have been deleted
-            # manually and so removed from qrc
-            for res in resources:
-                qrc.remove_resource(res, prefix)
-                v.info(
-                    ("The resource \'{}\' has been manually deleted and so"
-                     " removed from {}").format(res, qrc_file), verbose)
-
-        # Save modifications to qrc file
-        qrc.build()
+        plan = plan_update(qrc_file, config, manifest)
+        vanished = vanished or bool(plan.vanished)
+
+        if dry_run:
+            report_update(plan, verbose)
+        elif apply_update(plan, config, manifest, verbose):
+            modified.append(qrc_file)
+
+    if dry_run:
+        return modified
+
+    if vanished:
+        config.save()
+    manifest.save()
+
+    return modified
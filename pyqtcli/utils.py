@@ -1,14 +1,315 @@
 """Module with utils functions."""
 
 import os
+import fnmatch
+import itertools
+import configparser
 
+from concurrent.futures import ThreadPoolExecutor
 
-def recursive_file_search(ext, directory="."):
+
+# Directories never worth scanning for project files
+DEFAULT_IGNORE = [".git/", ".hg/", ".svn/", "node_modules/", "__pycache__/",
+                  ".tox/", ".nox/", ".venv/", "venv/", ".pyqtclicache/"]
+
+
+class IgnoreRules:
+    """Patterns of files and directories skipped while scanning a project.
+
+    Patterns follow the .gitignore syntax: a pattern ending with "/" only
+    matches directories, a pattern containing another "/" is matched
+    against the path relative to `base_path` and other patterns against
+    names. A pattern starting with "!" re-includes what previous patterns
+    excluded and the last matching pattern wins.
+
+    Attributes:
+        base_path (str): Absolute path to the directory patterns are
+            relative to.
+        _rules (list): Tuples of pattern, negation, directory only and
+            anchored flags.
+
+    """
+
+    def __init__(self, patterns=(), base_path="."):
+        self.base_path = os.path.abspath(base_path)
+        self._rules = []
+        for pattern in patterns:
+            self.add(pattern)
+
+    @classmethod
+    def for_project(cls, project):
+        """Return the rules of a project.
+
+        Default rules are completed with patterns of the .gitignore file of
+        the project directory and of the `ignore` option, one pattern per
+        line, of the [project] section of its .pyqtclirc file.
+
+        Args:
+            project (:class:`pyqtcli.config.ProjectContext`): Project paths.
+
+        Returns:
+            :class:`IgnoreRules`: Rules of the project.
+
+        """
+        rules = cls(DEFAULT_IGNORE, project.root_path)
+
+        try:
+            with open(os.path.join(project.root_path, ".gitignore")) as f:
+                for line in f:
+                    rules.add(line)
+        except OSError:
+            pass
+
+        cparser = configparser.ConfigParser()
+        cparser.read(project.config_path)
+        for line in cparser.get("project", "ignore", fallback="").split("\n"):
+            rules.add(line)
+
+        return rules
+
+    def add(self, pattern):
+        """Add a pattern, ignoring blank lines and comments.
+
+        Args:
+            pattern (str): Pattern with the .gitignore syntax.
+
+        """
+        pattern = pattern.strip()
+        if not pattern or pattern.startswith("#"):
+            return
+
+        negate = pattern.startswith("!")
+        if negate:
+            pattern = pattern[1:]
+
+        dir_only = pattern.endswith("/")
+        pattern = pattern.rstrip("/")
+
+        anchored = "/" in pattern
+        if pattern.startswith("**/"):
+            pattern = pattern[3:]
+            anchored = "/" in pattern
+        pattern = pattern.lstrip("/")
+
+        if pattern:
+            self._rules.append((pattern, negate, dir_only, anchored))
+
+    def match(self, rel_path, name, is_dir):
+        """Check if an entry is ignored.
+
+        Args:
+            rel_path (str): Path of the entry relative to `base_path` with "/"
+                separators.
+            name (str): Name of the entry.
+            is_dir (bool): True if the entry is a directory.
+
+        Returns:
+            bool: True if the entry has to be skipped.
+
+        """
+        ignored = False
+        for pattern, negate, dir_only, anchored in self._rules:
+            if dir_only and not is_dir:
+                continue
+            if fnmatch.fnmatchcase(rel_path if anchored else name, pattern):
+                ignored = not negate
+
+        return ignored
+
+    def __bool__(self):
+        return bool(self._rules)
+
+
+def scan_files(ext, directory=".", ignore=None, max_depth=None,
+               follow_symlinks=False):
+    """Yield files matching passed extension as directories are scanned.
+
+    Directories are listed once each with :func:`os.scandir` and ignored
+    directories are not entered. Like :func:`os.walk`, symbolic links to
+    directories aren't followed by default. When they are, links leading to
+    a directory already being scanned are skipped and a file reached through
+    several paths is only yielded once.
+
+    Args:
+        ext (str): File extension to search for.
+        directory (Optional[str]): Directory from which we must seek for
+            files.
+        ignore (Optional[:class:`IgnoreRules`]): Rules of entries to skip.
+        max_depth (Optional[int]): Maximal depth of subdirectories scanned,
+            0 to only scan `directory`.
+        follow_symlinks (Optional[bool]): If True, symbolic links to
+            directories are followed.
+
+    Yields:
+        str: Path to a matching file.
+
+    """
+    suffix = "." + ext
+
+    # Path of the scanned directory relative to ignore rules base path
+    rel_root = None
+    if ignore:
+        rel_root = os.path.relpath(os.path.abspath(directory),
+                                   ignore.base_path).replace(os.sep, "/")
+
+    # Identity of yielded files when links can lead to them several times
+    seen = set()
+
+    st = os.stat(directory)
+    # Each pending directory carries the identity of its ancestors
+    pending = [(directory, rel_root, 0, frozenset([(st.st_dev, st.st_ino)]))]
+    while pending:
+        path, rel_path, depth, ancestors = pending.pop()
+
+        try:
+            entries = sorted(os.scandir(path), key=lambda e: e.name)
+        except OSError:
+            continue
+
+        subdirs = []
+        for entry in entries:
+            try:
+                is_dir = entry.is_dir(follow_symlinks=follow_symlinks)
+            except OSError:
+                continue
+
+            entry_rel = None
+            if ignore:
+                entry_rel = (entry.name if rel_path in (".", None)
+                             else rel_path + "/" + entry.name)
+                if ignore.match(entry_rel, entry.name, is_dir):
+                    continue
+
+            if not is_dir:
+                if not entry.name.endswith(suffix):
+                    continue
+
+                if follow_symlinks:
+                    try:
+                        st = entry.stat()
+                    except OSError:
+                        continue
+                    identity = (st.st_dev, st.st_ino)
+                    if identity in seen:
+                        continue
+                    seen.add(identity)
+
+                yield entry.path
+                continue
+
+            if max_depth is not None and depth >= max_depth:
+                continue
+
+            try:
+                st = entry.stat()
+            except OSError:
+                continue
+
+            # Skip links to a directory containing them
+            identity = (st.st_dev, st.st_ino)
+            if identity in ancestors:
+                continue
+
+            subdirs.append((entry.path, entry_rel, depth + 1,
+                            ancestors | {identity}))
+
+        # Scan subdirectories in name order
+        pending.extend(reversed(subdirs))
+
+
+def walk_tree(top, workers=1):
+    """Walk a directory like :func:`os.walk`, each subdirectory apart.
+
+    Each subdirectory of `top` is walked in its own thread, which speeds up
+    scans of network mounted or cold cache folders. Walks are grouped by
+    subdirectory of `top` so that callers know which one each directory
+    belongs to without computing it from its path.
+
+    Args:
+        top (str): Directory to walk.
+        workers (Optional[int]): Number of threads walking subdirectories,
+            1 to walk them sequentially.
+
+    Returns:
+        tuple: Entry of `top` as yielded by :func:`os.walk`, None if it can't
+            be listed, and a list of tuples of name of a subdirectory of `top`
+            and entries of its walk, in the order :func:`os.walk` yields them.
+
+    """
+    try:
+        root, dirs, files = next(os.walk(top))
+    except StopIteration:
+        return None, []
+
+    # As os.walk, don't walk through symbolic links to directories
+    names = [d for d in dirs if not os.path.islink(os.path.join(root, d))]
+    paths = [os.path.join(root, d) for d in names]
+
+    if workers <= 1:
+        walks = [list(os.walk(path)) for path in paths]
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            walks = list(executor.map(lambda d: list(os.walk(d)), paths))
+
+    return (root, dirs, files), list(zip(names, walks))
+
+
+def walk_directory(top, workers=1):
+    """Walk a directory like :func:`os.walk` with subdirectories in parallel.
+
+    Results are merged in the order :func:`os.walk` yields them, so that
+    callers behave the same whatever the number of workers.
+
+    Args:
+        top (str): Directory to walk.
+        workers (Optional[int]): Number of threads walking subdirectories,
+            1 to walk them sequentially.
+
+    Returns:
+        list: Tuples of directory path, names of its subdirectories and names
+            of its files as yielded by :func:`os.walk` from `top`.
+
+    """
+    if workers <= 1:
+        return list(os.walk(top))
+
+    top_entry, walks = walk_tree(top, workers)
+    if top_entry is None:
+        return []
+
+    return [top_entry] + list(
+        itertools.chain.from_iterable(walk for _, walk in walks))
+
+
+def unique_paths(paths):
+    """Remove paths leading to the same file as a previous one.
+
+    Args:
+        paths (iterable): Paths to files.
+
+    Returns:
+        list: First path to each file, in the order of `paths`.
+
+    """
+    seen = set()
+    unique = []
+    for path in paths:
+        real_path = os.path.realpath(path)
+        if real_path not in seen:
+            seen.add(real_path)
+            unique.append(path)
+
+    return unique
+
+
+def recursive_file_search(ext, directory=".", ignore=None, max_depth=None):
     """Search recursively files matching passed extension from given directory.
 
     Args:
         ext (str): File extension to search for.
         directory (str[optional]): Directory from which we must seek for files.
+        ignore (Optional[:class:`IgnoreRules`]): Rules of entries to skip.
+        max_depth (Optional[int]): Maximal depth of subdirectories scanned.
 
     Returns:
         list: A list relative paths to matching files.
@@ -26,10 +327,4 @@ def recursive_file_search(ext, directory="."):
     if not os.path.isdir(directory):
         raise FileNotFoundError("No such directory: '{}'".format(directory))
 
-    found_files = []
-    for root, dirs, files in os.walk(directory):
-        for name in files:
-            if name.endswith('.' + ext):
-                found_files.append(os.path.join(root, name))
-
-    return found_files
+    return list(scan_files(ext, directory, ignore, max_depth))
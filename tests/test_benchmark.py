@@ -0,0 +1,314 @@
+"""Benchmarks checking that costly operations scale with inputs size.
+
+Sizes are reduced by default, use PYQTCLI_BENCH_SCALE=1 to run them at full
+scale.
+"""
+
+import os
+import sys
+import subprocess
+import pytest
+import tracemalloc
+
+from pyqtcli import makerc
+from pyqtcli.qrc import QRCFile
+from pyqtcli.qrc import read_qrc
+from pyqtcli.qrc import generate_qrc
+from pyqtcli.config import PyqtcliConfig
+from pyqtcli.update import update_project
+from pyqtcli.manifest import Manifest
+from pyqtcli.makerc import generate_rc
+from pyqtcli.makealias import write_alias
+from pyqtcli.test.qrc import QRCTestFile
+from pyqtcli.test.benchmark import scaled
+from pyqtcli.test.benchmark import timeit
+from pyqtcli.utils import IgnoreRules
+from pyqtcli.utils import DEFAULT_IGNORE
+from pyqtcli.utils import recursive_file_search
+
+
+def _qrc_with_resources(size):
+    qrc = QRCFile("res.qrc")
+    qrc.add_qresource("/")
+    for i in range(size):
+        qrc.add_file("images/icon_{}.png".format(i), "/")
+    return qrc
+
+
+def _add_and_remove(qrc, count=200):
+    for i in range(count):
+        qrc.add_file("new/icon_{}.png".format(i), "/")
+    for i in range(count):
+        qrc.remove_resource("new/icon_{}.png".format(i), "/")
+
+
+def test_add_remove_cost_is_flat():
+    small = _qrc_with_resources(1000)
+    large = _qrc_with_resources(scaled(100000))
+
+    small_time = timeit(_add_and_remove, small)
+    large_time = timeit(_add_and_remove, large)
+
+    assert large_time < small_time * 5 + 0.01
+
+
+def test_native_backend_beats_pyrcc5_on_small_qrcs():
+    qrc_files = []
+    for i in range(scaled(500, minimum=50)):
+        qrc = (
+            QRCTestFile("res{}".format(i)).add_qresource("/")
+            .add_file("images/icon_{}.png".format(i)).build()
+        )
+        qrc_files.append(qrc.path)
+
+    pyrcc5_time = timeit(generate_rc, qrc_files, False, repeat=1)
+    native_time = timeit(generate_rc, qrc_files, False, repeat=1,
+                         backend="native")
+
+    assert native_time < pyrcc5_time
+
+
+def test_native_backend_memory_is_bounded_by_chunk_size(monkeypatch):
+    monkeypatch.setattr(makerc, "CHUNK_SIZE", 64 * 1024)
+    size = scaled(256 * 1024 * 1024, minimum=16 * 1024 * 1024)
+
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("video.bin").add_file("texture.bin").build()
+    )
+
+    # Incompressible and highly compressible resources
+    with open("video.bin", "wb") as f:
+        for _ in range(size // makerc.CHUNK_SIZE):
+            f.write(os.urandom(makerc.CHUNK_SIZE))
+    with open("texture.bin", "wb") as f:
+        f.truncate(size)
+
+    tracemalloc.start()
+    try:
+        generate_rc([qrc.path], False, backend="native")
+        peak = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    assert os.path.getsize("res_rc.py") > 4 * size
+    assert peak < 64 * makerc.CHUNK_SIZE < size
+
+
+def test_recursive_search_prunes_ignored_trees():
+    # Most entries of the tree are in directories ignored by default
+    size = scaled(500000, minimum=5000)
+    for i in range(size // 100):
+        directory = os.path.join("node_modules", "pkg{}".format(i))
+        os.makedirs(directory)
+        for j in range(99):
+            open(os.path.join(directory, "f{}.js".format(j)), "a").close()
+    os.makedirs("src")
+    for i in range(10):
+        open(os.path.join("src", "res{}.qrc".format(i)), "a").close()
+
+    ignore = IgnoreRules(DEFAULT_IGNORE)
+    assert len(recursive_file_search("qrc", ignore=ignore)) == 10
+
+    full_time = timeit(recursive_file_search, "qrc", repeat=1)
+    pruned_time = timeit(recursive_file_search, "qrc", ignore=ignore)
+
+    assert pruned_time * 10 < full_time
+
+
+def _get_all_dirs(config, invalidate=False):
+    for qrc in config.get_qrcs():
+        if invalidate:
+            config.invalidate()
+        config.get_dirs(qrc)
+
+
+def test_config_accessors_dont_parse_file_again():
+    config = PyqtcliConfig(verbose=False)
+    for i in range(scaled(1000)):
+        name = "res{}.qrc".format(i)
+        config.cparser.add_section(name)
+        config.cparser.set(name, "path", name)
+        config.add_dirs(name, ["res{}/images".format(i),
+                               "res{}/icons".format(i)], commit=False)
+    config.save()
+
+    # Age the file so that its stamp can be trusted
+    mtime = os.stat(config.path).st_mtime - 60
+    os.utime(config.path, (mtime, mtime))
+
+    cached_time = timeit(_get_all_dirs, config)
+    parsed_time = timeit(_get_all_dirs, config, invalidate=True, repeat=1)
+
+    assert cached_time * 10 < parsed_time
+
+
+def test_qrc_build_memory_is_bounded():
+    qrc = QRCFile("res")
+    qrc.add_qresource("/")
+    for i in range(scaled(200000, minimum=20000)):
+        qrc.add_file("images/icons/icon{}.png".format(i), "/")
+
+    for written in (True, False):
+        tracemalloc.start()
+        try:
+            assert qrc.build() is written
+            peak = tracemalloc.get_traced_memory()[1]
+        finally:
+            tracemalloc.stop()
+
+        assert peak * 20 < os.path.getsize(qrc.path)
+
+
+def _peak_memory(statement):
+    """Return the peak resident memory in kB of a process running it."""
+    code = ("from pyqtcli import qrc\n{}\n"
+            "with open('/proc/self/status') as f:\n"
+            "    print([l.split()[1] for l in f if l.startswith('VmHWM')][0])")
+    env = dict(os.environ, PYTHONPATH=os.path.dirname(
+        os.path.dirname(os.path.abspath(makerc.__file__))))
+    return int(subprocess.check_output(
+        [sys.executable, "-c", code.format(statement)], env=env))
+
+
+@pytest.mark.skipif(not os.path.isfile("/proc/self/status"),
+                    reason="Peak memory read from /proc")
+def test_qrc_index_and_model_memory_is_bounded():
+    size = scaled(200000, minimum=50000)
+    qrc = QRCFile("res")
+    for prefix in range(10):
+        qrc.add_qresource("/prefix{}".format(prefix))
+        for i in range(size // 10):
+            qrc.add_file("images/icons/icon{}.png".format(i),
+                         "/prefix{}".format(prefix))
+    qrc.build()
+    del qrc
+
+    base = _peak_memory("")
+    tree = _peak_memory("q = qrc.read_qrc('res.qrc')")
+    index = _peak_memory("q = qrc.read_qrc_index('res.qrc')")
+    model = _peak_memory("q = qrc.read_qrc_model('res.qrc')")
+
+    assert (index - base) * 2 < tree - base
+    # Memory per resource of the model is a fraction of the tree one
+    assert (model - base) * 3 < tree - base
+
+
+def _update_from_scratch(config, qrc_file, content):
+    # Without manifest the whole folder is compared to the qrc file
+    manifest = Manifest(config.project)
+    if os.path.isfile(manifest.path):
+        os.remove(manifest.path)
+    with open(qrc_file, "wb") as f:
+        f.write(content)
+
+    update_project([qrc_file], config, False)
+
+
+def _resource_folder(config, name, size):
+    folder = os.path.join(name, "images")
+    os.makedirs(folder)
+    for i in range(size):
+        open(os.path.join(folder, "icon{}.png".format(i)), "a").close()
+
+    # Half of the files are recorded along with as many removed files
+    qrc = QRCFile(name, name)
+    qrc.add_qresource("/images")
+    qrc.add_files((os.path.join(folder, "icon{}.png".format(i))
+                   for i in range(0, size, 2)), "/images")
+    qrc.add_files((os.path.join(folder, "old{}.png".format(i))
+                   for i in range(size // 2)), "/images")
+    qrc.build()
+
+    config.cparser.add_section(qrc.name)
+    config.add_dirs(qrc.name, folder)
+
+    with open(qrc.path, "rb") as f:
+        return qrc.path, f.read()
+
+
+def test_update_diff_scales_linearly():
+    config = PyqtcliConfig(verbose=False)
+    size = scaled(50000)
+    small = _resource_folder(config, "small", size // 10)
+    large = _resource_folder(config, "large", size)
+
+    small_time = timeit(_update_from_scratch, config, *small)
+    large_time = timeit(_update_from_scratch, config, *large)
+
+    assert sorted(read_qrc(large[0]).list_resources("/images")) == sorted(
+        os.path.join("large", "images", "icon{}.png".format(i))
+        for i in range(size))
+    assert large_time < 30 * small_time
+
+
+def _deep_resources(name, depth, width=4):
+    # Nested directories are named as the resources folder
+    for i in range(width):
+        directory = os.path.join(name, "dir{}".format(i))
+        for _ in range(depth):
+            directory = os.path.join(directory, name)
+            os.makedirs(directory)
+            for j in range(5):
+                open(os.path.join(directory, "{}.png".format(j)), "a").close()
+
+
+def _generate_qrc(folder):
+    qrc = QRCFile(folder + ".qrc")
+    generate_qrc(qrc, folder, build=False)
+    return qrc
+
+
+def test_generate_qrc_on_deep_trees():
+    depth = scaled(1000, minimum=50)
+    _deep_resources("small", depth // 10)
+    _deep_resources("large", depth)
+
+    # Resources are recorded with the prefix of their first level directory
+    qrc = _generate_qrc("large")
+    for i in range(4):
+        prefix = "/dir{}".format(i)
+        resources = qrc.list_resources(prefix)
+        assert len(resources) == 5 * depth
+        assert all(res.startswith("large" + prefix + "/")
+                   for res in resources)
+
+    small_time = timeit(_generate_qrc, "small")
+    large_time = timeit(_generate_qrc, "large")
+
+    assert large_time < 20 * small_time
+
+
+def _alias_qrc(name, size):
+    # Each resource shares its name with another one
+    qrc = QRCFile(name)
+    qrc.add_qresource("/")
+    qrc.add_files(("images/{}/icon{}.png".format(i % 2, i // 2)
+                   for i in range(size)), "/")
+    qrc.build()
+
+    with open(qrc.path, "rb") as f:
+        return qrc.path, f.read()
+
+
+def _write_alias_from_scratch(qrc_file, content, strategy):
+    with open(qrc_file, "wb") as f:
+        f.write(content)
+
+    write_alias([qrc_file], False, strategy)
+
+
+def test_write_alias_scales_linearly():
+    size = scaled(50000)
+    small = _alias_qrc("small.qrc", size // 10)
+    large = _alias_qrc("large.qrc", size)
+
+    for strategy in ("skip", "parent", "hash"):
+        small_time = timeit(_write_alias_from_scratch, *small, strategy)
+        large_time = timeit(_write_alias_from_scratch, *large, strategy)
+
+        aliases = [res.get("alias") for res in read_qrc(large[0]).list_files()
+                   if res.get("alias")]
+        assert len(set(aliases)) == len(aliases)
+        assert len(aliases) == (size // 2 if strategy == "skip" else size)
+        assert large_time < 30 * small_time
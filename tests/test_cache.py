@@ -0,0 +1,70 @@
+import os
+
+from pyqtcli.cache import BuildCache
+from pyqtcli.test.qrc import QRCTestFile
+
+
+def test_cache_store_and_restore():
+    cache = BuildCache("cache")
+
+    with open("res_rc.py", "w") as f:
+        f.write("rc content")
+    cache.store("key", "res_rc.py")
+    os.remove("res_rc.py")
+
+    assert cache.restore("key", "res_rc.py")
+    with open("res_rc.py", "r") as f:
+        assert f.read() == "rc content"
+
+    assert not cache.restore("unknown", "other_rc.py")
+    assert not os.path.isfile("other_rc.py")
+
+
+def test_cache_evicts_least_recently_used_entries():
+    cache = BuildCache("cache", max_size=10)
+
+    for i in range(3):
+        with open("res_rc.py", "w") as f:
+            f.write("12345")
+        cache.store("key{}".format(i), "res_rc.py")
+        os.utime(os.path.join("cache", "key{}.py".format(i)),
+                 ns=(i * 10 ** 9, i * 10 ** 9))
+
+    cache.evict()
+
+    assert not os.path.isfile(os.path.join("cache", "key0.py"))
+    assert os.path.isfile(os.path.join("cache", "key1.py"))
+    assert os.path.isfile(os.path.join("cache", "key2.py"))
+
+
+def test_cache_key_depends_on_resources(monkeypatch):
+    cache = BuildCache("cache", hash_content=True)
+    monkeypatch.setattr(cache, "pyrcc5_version", lambda: "5.0")
+
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("file.txt").build()
+    )
+
+    key = cache.key(qrc.path)
+    assert key is not None
+    assert cache.key(qrc.path) == key
+
+    with open("file.txt", "a") as f:
+        f.write("modified")
+    assert cache.key(qrc.path) != key
+
+    os.remove("file.txt")
+    assert cache.key(qrc.path) is None
+
+
+def test_cache_key_without_pyrcc5(monkeypatch):
+    cache = BuildCache("cache")
+    monkeypatch.setattr(cache, "pyrcc5_version", lambda: None)
+
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("file.txt").build()
+    )
+
+    assert cache.key(qrc.path) is None
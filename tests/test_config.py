@@ -3,6 +3,7 @@ import pytest
 
 from pyqtcli.config import PyqtcliConfig
 from pyqtcli.test.verbose import format_msg
+from pyqtcli.config import ProjectContext
 from pyqtcli.config import find_project_config
 from pyqtcli.exception import PyqtcliConfigError
 
@@ -127,6 +128,19 @@ def test_find_nonexistent_project_config():
     assert find_project_config() is None
 
 
+# noinspection PyUnusedLocal
+def test_project_context_from_sub_directory(config):
+    root = os.getcwd()
+    os.mkdir("test")
+    os.chdir("test")
+
+    project = ProjectContext.find()
+    assert project.config_path == os.path.join(root, ".pyqtclirc")
+    assert project.root_path == root
+
+    assert PyqtcliConfig(project=project).path == project.config_path
+
+
 def test_get_existing_config_file(config):
     # Modify base config file
     config.cparser.add_section("test")
@@ -139,3 +153,54 @@ def test_get_existing_config_file(config):
     # Retrieve created config file
     found_config = PyqtcliConfig()
     assert found_config.cparser.sections() == ["project", "test"]
+
+
+def test_config_cache_is_validated_by_file_stamp(config):
+    config.cparser.add_section("res.qrc")
+    config.add_dirs("res.qrc", "resources")
+    mtime = os.stat(config.path).st_mtime - 60
+    os.utime(config.path, (mtime, mtime))
+
+    # Returned lists can be modified without altering the cache
+    config.get_dirs("res.qrc").append("test")
+    assert config.get_dirs("res.qrc") == ["resources"]
+
+    # Modifications from another instance are read
+    other = PyqtcliConfig()
+    other.add_dirs("res.qrc", "images")
+    assert config.get_dirs("res.qrc") == ["resources", "images"]
+
+
+def test_transaction_writes_config_once(config, monkeypatch):
+    config.cparser.add_section("res.qrc")
+    config.save()
+    before = str(config)
+
+    writes = []
+    write = config._write
+    monkeypatch.setattr(config, "_write", lambda: writes.append(write()))
+
+    with config.transaction():
+        config.add_dirs("res.qrc", "resources")
+        with config.transaction():
+            config.add_dirs("res.qrc", "images")
+        config.rm_dirs("res.qrc", "resources")
+        assert str(config) == before
+        assert config.get_dirs("res.qrc") == ["images"]
+
+    assert len(writes) == 1
+    assert PyqtcliConfig().get_dirs("res.qrc") == ["images"]
+    assert os.listdir(".") == [".pyqtclirc"]
+
+
+def test_transaction_discards_changes_on_error(config):
+    config.cparser.add_section("res.qrc")
+    config.add_dirs("res.qrc", "resources")
+
+    with pytest.raises(PyqtcliConfigError):
+        with config.transaction():
+            config.add_dirs("res.qrc", "images")
+            config.add_dirs("test.qrc", "images")
+
+    assert config.get_dirs("res.qrc") == ["resources"]
+    assert PyqtcliConfig().get_dirs("res.qrc") == ["resources"]
@@ -0,0 +1,50 @@
+import pytest
+
+from click.testing import CliRunner
+
+from pyqtcli import verbose as v
+from pyqtcli.cli import pyqtcli
+from pyqtcli.lock import ProjectLock
+from pyqtcli.config import ProjectContext
+from pyqtcli.test.qrc import QRCTestFile
+from pyqtcli.test.verbose import format_msg
+from pyqtcli.exception import PyqtcliLockError
+
+
+def test_shared_locks_exclude_exclusive_ones():
+    with ProjectLock(".pyqtclilock").shared():
+        with ProjectLock(".pyqtclilock", timeout=0).shared():
+            pass
+
+        with pytest.raises(PyqtcliLockError) as e:
+            with ProjectLock(".pyqtclilock", timeout=0.1).exclusive():
+                pass
+        assert str(e.value) == (
+            "Timed out after 0.1s waiting for another pyqtcli process "
+            "to release the project.")
+
+    with ProjectLock(".pyqtclilock", timeout=0).exclusive():
+        with pytest.raises(PyqtcliLockError):
+            ProjectLock(".pyqtclilock", timeout=0).acquire(exclusive=False)
+
+
+def test_commands_wait_for_project_lock(config):
+    runner = CliRunner()
+    QRCTestFile("res.qrc").add_qresource("/").add_file("file.txt").build()
+
+    lock = ProjectLock.for_project(ProjectContext.find())
+    with lock.exclusive():
+        result = runner.invoke(pyqtcli, ["--lock-timeout", "0", "makerc",
+                                         "res.qrc"])
+        assert result.exit_code == 1
+        assert format_msg(result.output) == v.error(
+            "Timed out after 0.0s waiting for another pyqtcli "
+            "process to release the project.\nAborted!\n")
+
+        result = runner.invoke(pyqtcli, ["update", "res.qrc"],
+                               env={"PYQTCLI_LOCK_TIMEOUT": "0"})
+        assert result.exit_code == 1
+
+    result = runner.invoke(pyqtcli, ["--lock-timeout", "0", "makerc",
+                                     "res.qrc"])
+    assert result.exit_code == 0
@@ -1,9 +1,11 @@
 import os
+import re
 
 from click.testing import CliRunner
 
 from pyqtcli.cli import pyqtcli
 from pyqtcli.qrc import read_qrc
+from pyqtcli.makealias import hash_alias
 from pyqtcli.test.qrc import QRCTestFile
 from pyqtcli.test.verbose import format_msg
 
@@ -106,3 +108,126 @@ def test_makealias_recursive_with_no_qrc():
 
     assert format_msg(result.output).startswith(
             "[ERROR]: Could not find any qrc files.")
+
+
+def test_makealias_reports_every_collision():
+    runner = CliRunner()
+
+    (
+        QRCTestFile("res.qrc")
+        .add_qresource("/").add_file("file.txt").add_file("a/file.txt")
+        .add_file("b/file.txt").add_file("icon.png").add_file("a/icon.png")
+        .add_file("last.txt")
+        .build()
+    )
+
+    result = runner.invoke(pyqtcli, ["makealias", "res.qrc"])
+    assert result.exit_code == 0
+
+    # Resources after a collision still get their alias
+    qrc = read_qrc("res.qrc")
+    assert [res.get("alias") for res in qrc.list_files()] == [
+        "file.txt", None, None, "icon.png", None, "last.txt"]
+
+    assert format_msg(result.output) == (
+        "[WARNING]: Alias 'file.txt' already exists in 'res.qrc' at prefix "
+        "'/'. Resources sharing it: file.txt, a/file.txt, b/file.txt.\n"
+        "[WARNING]: Alias 'icon.png' already exists in 'res.qrc' at prefix "
+        "'/'. Resources sharing it: icon.png, a/icon.png.\n"
+        "[INFO]: 1 qrc files rewritten, 0 unchanged.\n")
+
+
+def test_makealias_collision_strategies():
+    runner = CliRunner()
+
+    def make_qrc():
+        return (
+            QRCTestFile("res.qrc")
+            .add_qresource("/").add_file("file.txt")
+            .add_file("x/a/file.txt").add_file("y/a/file.txt")
+            .add_file("b/file.txt")
+            .build()
+        )
+
+    make_qrc()
+    result = runner.invoke(pyqtcli, ["makealias", "--collisions", "parent",
+                                     "res.qrc"])
+    assert result.exit_code == 0
+    assert [res.get("alias") for res in read_qrc("res.qrc").list_files()] == [
+        "file.txt", "x/a/file.txt", "y/a/file.txt", "b/file.txt"]
+
+    make_qrc()
+    runner.invoke(pyqtcli, ["makealias", "--collisions", "hash", "res.qrc"])
+    aliases = [res.get("alias") for res in read_qrc("res.qrc").list_files()]
+    assert aliases[0] == "file.txt"
+    assert len(set(aliases)) == 4
+    for alias in aliases[1:]:
+        assert re.match(r"^file_[0-9a-f]{8}\.txt$", alias)
+
+    # Existing aliases are kept and new resources are qualified
+    qrc = read_qrc("res.qrc")
+    qrc.add_file("c/file.txt", "/")
+    qrc.build()
+    runner.invoke(pyqtcli, ["makealias", "--collisions", "parent", "res.qrc"])
+    aliases = [res.get("alias") for res in read_qrc("res.qrc").list_files()]
+    assert aliases[:4] == [
+        "file.txt", hash_alias("x/a/file.txt"), hash_alias("y/a/file.txt"),
+        hash_alias("b/file.txt")]
+    assert aliases[4] == "c/file.txt"
+
+
+def test_makealias_leaves_aliased_qrc_untouched():
+    runner = CliRunner()
+
+    for name in ["res", "other"]:
+        (
+            QRCTestFile(name)
+            .add_qresource("/").add_file("file.txt").add_file("test.txt")
+            .build()
+        )
+
+    result = runner.invoke(pyqtcli, ["makealias", "-j", "2", "res.qrc",
+                                     "other.qrc"])
+    assert format_msg(result.output).endswith(
+        "[INFO]: 2 qrc files rewritten, 0 unchanged.\n")
+
+    # Only the qrc file with a new resource is written again
+    os.utime("res.qrc", (0, 0))
+    os.utime("other.qrc", (0, 0))
+    qrc = read_qrc("other.qrc")
+    qrc.add_file("new.txt", "/")
+    qrc.build()
+
+    result = runner.invoke(pyqtcli, ["makealias", "-v", "res.qrc",
+                                     "other.qrc"])
+    assert result.exit_code == 0
+    assert os.stat("res.qrc").st_mtime == 0
+    assert read_qrc("other.qrc").get_file("new.txt", "/").get(
+        "alias") == "new.txt"
+    assert format_msg(result.output) == (
+        "[INFO]: Current file: res.qrc\n"
+        "[INFO]: Current file: other.qrc\n"
+        "[INFO]: resource: 'new.txt' => new.txt\n"
+        "[INFO]: 1 qrc files rewritten, 1 unchanged.\n")
+
+
+def test_makealias_processes_each_qrc_once():
+    runner = CliRunner()
+
+    (
+        QRCTestFile("res")
+        .add_qresource("/").add_file("file.txt").add_file("test.txt")
+        .build()
+    )
+
+    for _ in range(20):
+        result = runner.invoke(pyqtcli, [
+            "makealias", "-r", "-j", "3", "res.qrc", "./res.qrc",
+            os.path.abspath("res.qrc")])
+        assert result.exit_code == 0
+        assert [res.get("alias") for res in read_qrc("res.qrc").list_files()
+                ] == ["file.txt", "test.txt"]
+
+    assert format_msg(result.output) == (
+        "[INFO]: 0 qrc files rewritten, 1 unchanged.\n")
+    assert not [name for name in os.listdir(".") if name.endswith(".tmp")]
@@ -1,9 +1,23 @@
+import io
 import os
+import sys
+import time
+import types
+import threading
+import pytest
+import subprocess
 
 from click.testing import CliRunner
 
 from pyqtcli.cli import pyqtcli
+from pyqtcli.qrc import read_qrc
+from pyqtcli.makerc import write_rc
+from pyqtcli.makerc import write_rcc
+from pyqtcli.makerc import resource_tree
+from pyqtcli.makerc import is_up_to_date
 from pyqtcli.test.qrc import QRCTestFile
+from pyqtcli.test.rcc import read_rcc
+from pyqtcli.exception import RCCompilerError
 from pyqtcli.test.verbose import format_msg
 
 
@@ -126,3 +140,373 @@ def test_makerc_with_empty_qrc_file():
         "[WARNING]: res.qrc has no more resources and cannot "
         "generates its corresponding rc file.\n"
     )
+
+
+def test_makerc_jobs_keeps_messages_order():
+    runner = CliRunner()
+
+    qrc_files = []
+    for i in range(6):
+        QRCTestFile("res{}".format(i)).build()
+        qrc_files.append("res{}.qrc".format(i))
+        open("invalid{}.qrc".format(i), "a").close()
+        qrc_files.append("invalid{}.qrc".format(i))
+
+    result = runner.invoke(pyqtcli, ["makerc", "-j", "4"] + qrc_files)
+
+    expected = ""
+    for i in range(6):
+        expected += (
+            "[WARNING]: res{}.qrc has no more resources and cannot "
+            "generates its corresponding rc file.\n"
+            "[WARNING]: Qrc file: \'invalid{}.qrc\' is not valid.\n"
+        ).format(i, i)
+    assert format_msg(result.output) == expected
+
+
+def test_makerc_jobs_bounds_pyrcc5_processes(monkeypatch):
+    runner = CliRunner()
+
+    lock = threading.Lock()
+    running = [0]
+    max_running = [0]
+    run = subprocess.run
+
+    def counting_run(*args, **kwargs):
+        with lock:
+            running[0] += 1
+            max_running[0] = max(max_running[0], running[0])
+        time.sleep(0.05)
+        try:
+            return run(*args, **kwargs)
+        finally:
+            with lock:
+                running[0] -= 1
+
+    monkeypatch.setattr(subprocess, "run", counting_run)
+
+    qrc_files = []
+    for i in range(6):
+        qrc = (
+            QRCTestFile("res{}".format(i)).add_qresource("/")
+            .add_file("file{}.txt".format(i)).build()
+        )
+        qrc_files.append(qrc.path)
+
+    result = runner.invoke(pyqtcli, ["makerc", "-j", "2"] + qrc_files)
+    assert result.exit_code == 0
+
+    assert max_running[0] == 2
+    for i in range(6):
+        assert os.path.isfile("res{}_rc.py".format(i))
+
+
+def test_makerc_warm_cache_does_not_run_pyrcc5(monkeypatch):
+    runner = CliRunner()
+
+    qrc_files = []
+    for i in range(3):
+        qrc = (
+            QRCTestFile("res{}".format(i)).add_qresource("/")
+            .add_file("file{}.txt".format(i)).build()
+        )
+        qrc_files.append(qrc.path)
+
+    result = runner.invoke(pyqtcli, ["makerc"] + qrc_files)
+    assert result.exit_code == 0
+
+    calls = []
+    run = subprocess.run
+
+    def counting_run(*args, **kwargs):
+        calls.append(args[0])
+        return run(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", counting_run)
+
+    os.remove("res0_rc.py")
+    result = runner.invoke(pyqtcli, ["makerc"] + qrc_files)
+    assert result.exit_code == 0
+
+    assert calls == []
+    assert os.path.isfile("res0_rc.py")
+
+    # Modified resource invalidates its qrc entry
+    with open("file1.txt", "a") as f:
+        f.write("modified")
+
+    result = runner.invoke(pyqtcli, ["makerc"] + qrc_files)
+    assert result.exit_code == 0
+    assert len(calls) == 1
+
+
+def test_makerc_no_cache_option(monkeypatch):
+    runner = CliRunner()
+
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("file.txt").build()
+    )
+
+    runner.invoke(pyqtcli, ["makerc", qrc.path])
+
+    calls = []
+    run = subprocess.run
+
+    def counting_run(*args, **kwargs):
+        calls.append(args[0])
+        return run(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", counting_run)
+
+    result = runner.invoke(pyqtcli, ["makerc", "--no-cache", qrc.path])
+    assert result.exit_code == 0
+    assert len(calls) == 1
+
+
+def test_native_backend_matches_pyrcc5():
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("file.txt")
+        .add_file("images/icon.png")
+        .add_qresource("/sounds")
+        .add_file("sounds/intro.ogg")
+        .add_file("file.txt")
+        .build()
+    )
+
+    for i, resource in enumerate(["file.txt", "images/icon.png"]):
+        with open(resource, "wb") as f:
+            f.write(bytes(range(i * 7, 256)))
+
+    root, errors = resource_tree(read_qrc(qrc.path))
+    assert errors == []
+
+    output = io.StringIO()
+    write_rc(root, output)
+
+    pyrcc5 = subprocess.run(["pyrcc5", qrc.path], stdout=subprocess.PIPE)
+    assert output.getvalue() == pyrcc5.stdout.decode("utf-8")
+
+
+def test_makerc_native_backend(monkeypatch):
+    runner = CliRunner()
+
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("file.txt").build()
+    )
+
+    calls = []
+    run = subprocess.run
+
+    def counting_run(*args, **kwargs):
+        calls.append(args[0])
+        return run(*args, **kwargs)
+
+    monkeypatch.setattr(subprocess, "run", counting_run)
+
+    result = runner.invoke(
+        pyqtcli, ["makerc", "-v", "--backend", "native", qrc.path])
+    assert result.exit_code == 0
+    assert format_msg(result.output) == (
+        "[INFO]: Python qrc file '{}' created.\n".format(
+            os.path.abspath("res_rc.py")))
+
+    assert calls == []
+    assert os.path.isfile("res_rc.py")
+
+
+def test_makerc_native_backend_errors():
+    runner = CliRunner()
+
+    QRCTestFile("res.qrc").build()
+    open("invalid.qrc", "a").close()
+    (
+        QRCTestFile("missing").add_qresource("/")
+        .add_file("file.txt").build()
+    )
+    os.remove("file.txt")
+
+    result = runner.invoke(
+        pyqtcli, ["makerc", "--backend", "native", "res.qrc", "invalid.qrc",
+                  "missing.qrc"])
+    assert format_msg(result.output) == (
+        "[WARNING]: res.qrc has no more resources and cannot "
+        "generates its corresponding rc file.\n"
+        "[WARNING]: Qrc file: 'invalid.qrc' is not valid.\n"
+        "[WARNING]: Cannot find file: file.txt No resources in resource "
+        "description.\n"
+    )
+
+
+def test_native_compiler_rejects_unsupported_qrcs():
+    qrc = QRCTestFile("res").add_qresource("/").add_file("file.txt").build()
+    os.remove("file.txt")
+    os.mkdir("file.txt")
+
+    with pytest.raises(RCCompilerError) as e:
+        resource_tree(read_qrc(qrc.path))
+    assert str(e.value) == "directories are not supported"
+
+    qrc = read_qrc(qrc.path)
+    qrc.get_qresource("/").set("lang", "fr")
+    with pytest.raises(RCCompilerError) as e:
+        resource_tree(qrc)
+    assert str(e.value) == "lang attribute is not supported"
+
+
+def test_makerc_rcc_format():
+    runner = CliRunner()
+
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("file.txt")
+        .add_qresource("/images")
+        .add_file("images/icon.png")
+        .add_file("images/big.bmp")
+        .build()
+    )
+
+    with open("file.txt", "w") as f:
+        f.write("text")
+    with open("images/big.bmp", "wb") as f:
+        f.write(bytes(4096))
+
+    result = runner.invoke(
+        pyqtcli, ["makerc", "-v", "--format", "rcc", qrc.path])
+    assert result.exit_code == 0
+
+    assert read_rcc("res.rcc") == {
+        ":/file.txt": b"text",
+        ":/images/images/icon.png": b"",
+        ":/images/images/big.bmp": bytes(4096),
+    }
+
+    with open("res_rc.py") as f:
+        loader = f.read()
+    assert "QResource.registerResource" in loader
+    assert "qt_resource_data" not in loader
+
+
+def test_rcc_format_holds_python_module_sections():
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("file.txt")
+        .add_file("sub/dir/other.txt")
+        .build()
+    )
+
+    with open("file.txt", "w") as f:
+        f.write("x" * 500)
+
+    root, errors = resource_tree(read_qrc(qrc.path))
+    output = io.BytesIO()
+    write_rcc(root, output)
+    rcc = output.getvalue()
+
+    root, errors = resource_tree(read_qrc(qrc.path))
+    module = {}
+    output = io.StringIO()
+    write_rc(root, output)
+    exec(output.getvalue().split("qt_version")[0].replace(
+        "from PyQt5 import QtCore", ""), module)
+
+    data = int.from_bytes(rcc[12:16], "big")
+    names = int.from_bytes(rcc[16:20], "big")
+    tree = int.from_bytes(rcc[8:12], "big")
+    assert rcc[4:8] == (2).to_bytes(4, "big")
+    assert rcc[data:names] == module["qt_resource_data"]
+    assert rcc[names:tree] == module["qt_resource_name"]
+    assert rcc[tree:] == module["qt_resource_struct_v2"]
+
+
+def test_makerc_split_by_prefix():
+    runner = CliRunner()
+
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("file.txt")
+        .add_qresource("/images")
+        .add_file("images/icon.png")
+        .add_qresource("/images-hd")
+        .add_file("images-hd/icon.png")
+        .build()
+    )
+
+    result = runner.invoke(
+        pyqtcli, ["makerc", "-v", "--split-by-prefix", qrc.path])
+    assert result.exit_code == 0
+
+    for module in ["res_rc", "res_rc_root", "res_rc_images",
+                   "res_rc_images_hd"]:
+        assert os.path.isfile(module + ".py")
+
+    index = {}
+    with open("res_rc.py") as f:
+        exec(f.read(), index)
+    assert index["rc_modules"] == {
+        "/": "res_rc_root",
+        "/images": "res_rc_images",
+        "/images-hd": "res_rc_images_hd",
+    }
+
+    module = {}
+    with open("res_rc_images.py") as f:
+        exec(f.read().split("qt_version")[0].replace(
+            "from PyQt5 import QtCore", ""), module)
+    names = module["qt_resource_name"]
+    assert "icon.png".encode("utf-16-be") in names
+    assert "file.txt".encode("utf-16-be") not in names
+
+
+def test_split_index_loads_prefixes_on_demand(monkeypatch):
+    runner = CliRunner()
+
+    qrc = (
+        QRCTestFile("res").add_qresource("/")
+        .add_file("file.txt")
+        .add_qresource("/images")
+        .add_file("images/icon.png")
+        .build()
+    )
+
+    runner.invoke(pyqtcli, ["makerc", "--split-by-prefix", qrc.path])
+
+    # Record registrations made by rc modules instead of using Qt
+    registered = []
+    qtcore = types.ModuleType("QtCore")
+    qtcore.qVersion = lambda: "5.15.0"
+    qtcore.qRegisterResourceData = lambda *args: registered.append(args[2])
+    pyqt5 = types.ModuleType("PyQt5")
+    pyqt5.QtCore = qtcore
+    monkeypatch.setitem(sys.modules, "PyQt5", pyqt5)
+    monkeypatch.setitem(sys.modules, "PyQt5.QtCore", qtcore)
+    monkeypatch.syspath_prepend(os.getcwd())
+
+    import res_rc
+    try:
+        assert registered == []
+
+        res_rc.ensure_loaded("/images")
+        res_rc.ensure_loaded("/images/")
+        assert len(registered) == 1
+        assert "icon".encode("utf-16-be") in registered[0]
+    finally:
+        for module in ["res_rc", "res_rc_root", "res_rc_images"]:
+            sys.modules.pop(module, None)
+
+
+def test_is_up_to_date_follows_resources_changes():
+    qrc = QRCTestFile("res").add_qresource("/").add_file("file.txt").build()
+    open("file.txt", "a").close()
+    open("res_rc.py", "a").close()
+
+    os.utime(qrc.path, (1000, 1000))
+    os.utime("file.txt", (1000, 1000))
+    os.utime("res_rc.py", (2000, 2000))
+    assert is_up_to_date(qrc.path)
+
+    # A resource modified after the rc file makes it outdated
+    os.utime("file.txt", (3000, 3000))
+    assert not is_up_to_date(qrc.path)
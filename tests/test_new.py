@@ -111,3 +111,37 @@ def test_new_duplication():
     assert format_msg(result.output).startswith(
         "[ERROR]: A qrc file named \'res.qrc\' already exists"
     )
+
+
+# noinspection PyUnusedLocal
+def test_new_qrc_with_scan_workers(config, test_resources):
+    runner = CliRunner()
+    os.makedirs("resources/images/assets/deep/deeper")
+    open("resources/images/assets/deep/deeper/bg.png", "a").close()
+    os.symlink(os.path.abspath("resources/musics"), "resources/link")
+
+    runner.invoke(pyqtcli, ["new", "qrc", "res.qrc", "resources"])
+    result = runner.invoke(pyqtcli, ["new", "qrc", "--scan-workers", "4",
+                                     "parallel.qrc", "resources"])
+    assert result.exit_code == 0
+
+    # Parallel scan records resources in the same order
+    with open("res.qrc", "rb") as f, open("parallel.qrc", "rb") as p:
+        assert f.read() == p.read()
+
+
+# noinspection PyUnusedLocal
+def test_new_qrc_prefixes_dont_depend_on_folder_path(config, test_resources):
+    runner = CliRunner()
+    os.makedirs("resources/images/resources")
+    open("resources/images/resources/icon.png", "a").close()
+
+    result = runner.invoke(pyqtcli, ["new", "qrc", "res.qrc", "resources/"])
+    assert result.exit_code == 0
+
+    qrc = read_qrc("res.qrc")
+    assert "resources/images/resources/icon.png" in qrc.list_resources(
+        "/images")
+    assert "resources/file.txt" in qrc.list_resources("/")
+    assert all(res.startswith("resources/musics/")
+               for res in qrc.list_resources("/musics"))
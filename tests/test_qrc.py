@@ -1,8 +1,13 @@
 import os
 import pytest
 
+from lxml import etree
+
 from pyqtcli.qrc import QRCFile
 from pyqtcli.qrc import read_qrc
+from pyqtcli.qrc import read_qrc_index
+from pyqtcli.qrc import read_qrc_model
+from pyqtcli.qrc import QRCModel
 from pyqtcli.qrc import get_prefix_update
 from pyqtcli.qrc import fill_qresource
 from pyqtcli.test.qrc import QRCTestFile
@@ -143,6 +148,32 @@ def test_remove_resource():
                             "'test.txt' in qresource \'/\'")
 
 
+def test_add_and_remove_files_in_bulk():
+    qrc = QRCFile("res.qrc")
+    qrc.add_qresource("/")
+    qrc.add_qresource("/test")
+
+    qrc.add_files(("file{}.txt".format(i) for i in range(5)), "/")
+    qrc.add_files(["file0.txt"], "/test")
+    assert qrc.list_resources("/") == [
+        "file0.txt", "file1.txt", "file2.txt", "file3.txt", "file4.txt"]
+
+    removed = qrc.remove_resources(["file3.txt", "file1.txt"], "/")
+    assert [res.text for res in removed] == ["file1.txt", "file3.txt"]
+    assert qrc.list_resources("/") == ["file0.txt", "file2.txt", "file4.txt"]
+    assert qrc.list_resources("/test") == ["file0.txt"]
+
+    # Nothing is removed if a resource isn't recorded
+    with pytest.raises(QresourceError) as e:
+        qrc.remove_resources(["file0.txt", "file1.txt"], "/")
+    assert str(e.value) == ("Error: No <file> child corresponding to "
+                            "'file1.txt' in qresource \'/\'")
+    assert qrc.list_resources("/") == ["file0.txt", "file2.txt", "file4.txt"]
+
+    with pytest.raises(QresourceError):
+        qrc.add_files(["file.txt"], "/images")
+
+
 def test_remove_nonexistent_resource():
     qrc = (
         QRCTestFile("res.qrc")
@@ -328,3 +359,246 @@ def test_fill_qresource_with_two_prefixes(config, test_resources):
 
     for resource in qrc.list_resources("/images"):
         assert resource.startswith("resources/images")
+
+
+def test_indexes_follow_qrc_modifications():
+    (
+        QRCTestFile("res.qrc")
+        .add_qresource().add_file("test.txt")
+        .add_qresource("/images").add_file("images/logo.png")
+        .build()
+    )
+
+    # Indexes are rebuilt from the parsed file
+    r_qrc = read_qrc("res.qrc")
+    assert r_qrc.get_file("images/logo.png", "/images").text == (
+        "images/logo.png")
+
+    # Removed then added again resources and qresources are found
+    r_qrc.remove_resource("test.txt", "/")
+    r_qrc.add_file("test.txt", "/")
+    assert r_qrc.get_file("test.txt", "/") in r_qrc.list_files("/")
+
+    r_qrc.remove_qresource("/images")
+    r_qrc.add_qresource("/images")
+    assert r_qrc.list_resources("/images") == []
+    with pytest.raises(QresourceError):
+        r_qrc.get_file("images/logo.png", "/images")
+
+
+def test_sorted_qrc_inserts_resources_in_place():
+    qrc = QRCFile("res.qrc", sort=True)
+    qrc.add_qresource("/")
+    qrc.add_qresource("/test")
+
+    for resource in ["c.txt", "a.txt", "d.txt", "b.txt"]:
+        qrc.add_file(resource, "/")
+    assert qrc.list_resources("/") == ["a.txt", "b.txt", "c.txt", "d.txt"]
+
+    # Added resources are merged with recorded ones
+    qrc.add_files(["e.txt", "a0.txt", "c0.txt"], "/")
+    qrc.add_files(["z.txt", "y.txt"], "/test")
+    assert qrc.list_resources("/") == [
+        "a.txt", "a0.txt", "b.txt", "c.txt", "c0.txt", "d.txt", "e.txt"]
+    assert qrc.list_resources("/test") == ["y.txt", "z.txt"]
+
+    qrc.remove_resource("b.txt", "/")
+    qrc.remove_resources(["a0.txt", "e.txt"], "/")
+    qrc.remove_file(qrc.get_file("d.txt", "/"), "/")
+    qrc.add_file("b0.txt", "/")
+    qrc.add_file("f.txt", "/")
+    assert qrc.list_resources("/") == [
+        "a.txt", "b0.txt", "c.txt", "c0.txt", "f.txt"]
+
+    qrc.remove_qresource("/test")
+    qrc.add_qresource("/test")
+    qrc.add_files(["b.txt", "a.txt"], "/test")
+    assert qrc.list_resources("/test") == ["a.txt", "b.txt"]
+
+
+def test_read_sorted_qrc():
+    (
+        QRCTestFile("res.qrc")
+        .add_qresource().add_file("b.txt").add_file("a.txt")
+        .add_qresource("/images").add_file("c.png")
+        .build()
+    )
+
+    # Resources are only reordered in sort mode
+    assert read_qrc("res.qrc").list_resources("/") == ["b.txt", "a.txt"]
+
+    qrc = read_qrc("res.qrc", sort=True)
+    assert qrc.list_resources("/") == ["a.txt", "b.txt"]
+
+    qrc.add_file("a0.txt", "/")
+    qrc.add_file("b.png", "/images")
+    assert qrc.list_resources() == [
+        "a.txt", "a0.txt", "b.txt", "b.png", "c.png"]
+
+
+def test_qresources_sharing_a_prefix():
+    with open("res.qrc", "w") as f:
+        f.write('<RCC>\n'
+                '  <qresource prefix="/">\n'
+                '    <file>a.txt</file>\n'
+                '  </qresource>\n'
+                '  <qresource prefix="/" lang="fr">\n'
+                '    <file>fr/a.txt</file>\n'
+                '  </qresource>\n'
+                '</RCC>\n')
+
+    # Resources are looked up in the first qresource of the prefix
+    qrc = read_qrc("res.qrc")
+    with pytest.raises(QresourceError):
+        qrc.remove_resource("fr/a.txt", "/")
+    with pytest.raises(QresourceError):
+        qrc.remove_resources(["fr/a.txt"], "/")
+    assert qrc.list_resources() == ["a.txt", "fr/a.txt"]
+
+    assert [res.text for res in qrc.remove_resources(["a.txt"], "/")] == [
+        "a.txt"]
+    with pytest.raises(QresourceError):
+        qrc.get_file("a.txt", "/")
+
+    # The other qresource takes over the prefix once the first is removed
+    qrc.remove_qresource("/")
+    assert qrc.get_qresource("/").get("lang") == "fr"
+    assert qrc.remove_resource("fr/a.txt", "/").text == "fr/a.txt"
+    assert qrc.list_resources() == []
+
+
+def test_duplicated_resources():
+    for sort in (False, True):
+        qrc = QRCFile("res.qrc", sort=sort)
+        qrc.add_qresource("/")
+        qrc.add_file("dup.txt", "/")
+        qrc.add_file("dup.txt", "/")
+        qrc.add_files(["dup.txt"], "/")
+
+        # Remaining duplicates are still found
+        first = qrc.get_file("dup.txt", "/")
+        assert qrc.remove_resource("dup.txt", "/") is first
+        assert qrc.get_file("dup.txt", "/") is not first
+        qrc.remove_file(qrc.list_files("/")[-1], "/")
+        assert qrc.get_file("dup.txt", "/") is qrc.list_files("/")[0]
+        assert qrc.list_resources("/") == ["dup.txt"]
+
+        qrc.remove_resource("dup.txt", "/")
+        with pytest.raises(QresourceError):
+            qrc.get_file("dup.txt", "/")
+
+        # Bulk removal removes every duplicate
+        qrc.add_files(["dup.txt", "dup.txt"], "/")
+        assert len(qrc.remove_resources(["dup.txt"], "/")) == 2
+        assert qrc.list_resources("/") == []
+        with pytest.raises(QresourceError):
+            qrc.get_file("dup.txt", "/")
+
+
+# noinspection PyUnusedLocal
+def test_fill_qresource_scans_project_once(config, monkeypatch):
+    scandir = os.scandir
+    calls = []
+
+    def counting_scandir(path="."):
+        calls.append(path)
+        return scandir(path)
+
+    def count_scans(size):
+        folder = "resources_{}".format(size)
+        os.makedirs(os.path.join(folder, "images"))
+        for i in range(size):
+            open(os.path.join(folder, "images", "{}.png".format(i)),
+                 "a").close()
+
+        calls.clear()
+        qrc = QRCFile("res_{}.qrc".format(size))
+        qrc.add_qresource("/images")
+        fill_qresource(qrc, folder + "/images", "/images")
+        assert len(qrc.list_resources("/images")) == size
+        return len(calls)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+
+    # Number of directory scans does not depend on the number of resources
+    assert count_scans(2) == count_scans(50)
+
+
+def test_build_skips_unchanged_qrc():
+    qrc = QRCFile("res")
+    qrc.add_qresource("/")
+    assert qrc.build()
+
+    os.utime(qrc.path, (0, 0))
+    assert not qrc.build()
+    assert os.stat(qrc.path).st_mtime == 0
+
+    qrc.add_file("file.txt", "/")
+    assert qrc.build()
+    assert read_qrc(qrc.path).list_resources() == ["file.txt"]
+    assert os.listdir(".") == ["res.qrc"]
+
+    with open(qrc.path, "rb") as f:
+        assert f.read() == etree.tostring(qrc.tree, pretty_print=True)
+
+
+def test_read_qrc_index():
+    with open("res.qrc", "w") as f:
+        f.write(
+            "<!DOCTYPE RCC><RCC version=\"1.0\">\n"
+            "<qresource prefix=\"/images\">\n"
+            "  <file alias=\"icon.png\">images/icon.png</file>\n"
+            "  <file>images/a&amp;b.png</file>\n"
+            "</qresource>\n"
+            "<qresource>\n"
+            "  <file/>\n"
+            "</qresource>\n"
+            "<qresource prefix=\"/images\" lang=\"fr\">\n"
+            "  <file>images/fr/icon.png</file>\n"
+            "</qresource>\n"
+            "</RCC>\n")
+
+    index = read_qrc_index("res.qrc")
+    assert list(index.items()) == [
+        ("/images", (("images/icon.png", "icon.png"),
+                     ("images/a&b.png", None),
+                     ("images/fr/icon.png", None))),
+        (None, ((None, None),))
+    ]
+
+    with pytest.raises(QRCFileError):
+        read_qrc_index("nonexistent.qrc")
+
+
+def test_qrc_model_round_trip():
+    with open("res.qrc", "w") as f:
+        f.write(
+            "<RCC version=\"1.0\">\n"
+            "  <qresource prefix=\"/images\" lang=\"fr\">\n"
+            "    <file alias=\"icon.png\" compress=\"9\">icon.png</file>\n"
+            "    <file>logo.png</file>\n"
+            "  </qresource>\n"
+            "  <qresource>\n"
+            "    <file threshold=\"0\">file.txt</file>\n"
+            "  </qresource>\n"
+            "</RCC>\n")
+
+    qrc = read_qrc("res.qrc")
+    model = QRCModel.from_tree(qrc.tree)
+    assert (etree.tostring(model.to_tree(), pretty_print=True) ==
+            etree.tostring(qrc.tree, pretty_print=True))
+
+    images, root = model.qresources
+    assert (images.prefix, images.lang, len(images)) == ("/images", "fr", 2)
+    assert images.file_attributes == {0: {"compress": "9"}}
+    assert root.prefix is None and root.attributes is None
+
+    assert list(model.resources("/images")) == [
+        ("icon.png", "icon.png"), ("logo.png", None)]
+    assert [r.path for r in model.resources()] == [
+        "icon.png", "logo.png", "file.txt"]
+
+    # Reading the file directly records the same model
+    direct = read_qrc_model("res.qrc")
+    assert (etree.tostring(direct.to_tree()) ==
+            etree.tostring(model.to_tree()))
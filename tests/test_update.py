@@ -6,7 +6,9 @@ import shutil
 from click.testing import CliRunner
 
 from pyqtcli.cli import pyqtcli
+from pyqtcli.qrc import QRCFile
 from pyqtcli.qrc import read_qrc
+from pyqtcli.update import diff_resources
 from pyqtcli.test.qrc import QRCTestFile
 from pyqtcli.test.verbose import format_msg
 from pyqtcli.exception import QresourceError
@@ -140,3 +142,194 @@ def test_update_with_qrc_recording_res_in_project_dir(config):
 
     # Check corresponding rc has been generated
     assert os.path.isfile("res_rc.py")
+
+
+def _age_directories(top, age=3600):
+    """Set modification time of directories in the past."""
+    for root, dirs, files in os.walk(top):
+        past = os.stat(root).st_mtime_ns - age * 10 ** 9
+        os.utime(root, ns=(past, past))
+
+
+# noinspection PyUnusedLocal
+def test_update_lists_only_modified_directories(config, test_resources,
+                                                monkeypatch):
+    runner = CliRunner()
+    runner.invoke(pyqtcli, ["new", "qrc", "res.qrc", "resources"])
+
+    # First update records the state of resources folders
+    _age_directories("resources")
+    runner.invoke(pyqtcli, ["update", "res.qrc"])
+    assert os.path.isfile(".pyqtclimanifest")
+
+    scandir = os.scandir
+    scanned = []
+
+    def counting_scandir(path="."):
+        scanned.append(path)
+        return scandir(path)
+
+    monkeypatch.setattr(os, "scandir", counting_scandir)
+
+    # Nothing changed so no resources directory is listed again
+    runner.invoke(pyqtcli, ["update", "res.qrc"])
+    assert [p for p in scanned if str(p).startswith("resources")] == []
+
+    # Only the modified directory is listed
+    open("resources/images/toolbar/open.svg", "a").close()
+    os.remove("resources/musics/solos/solo1.mp3")
+    scanned.clear()
+    runner.invoke(pyqtcli, ["update", "res.qrc"])
+    assert sorted(p for p in scanned if str(p).startswith("resources")) == [
+        "resources/images/toolbar", "resources/musics/solos"]
+
+    qrc = read_qrc("res.qrc")
+    assert "resources/images/toolbar/open.svg" in qrc.list_resources(
+        "/images")
+    assert "resources/musics/solos/solo1.mp3" not in qrc.list_resources(
+        "/musics")
+
+
+# noinspection PyUnusedLocal
+def test_update_after_manual_qrc_modification(config, test_resources):
+    runner = CliRunner()
+    runner.invoke(pyqtcli, ["new", "qrc", "res.qrc", "resources"])
+    _age_directories("resources")
+    runner.invoke(pyqtcli, ["update", "res.qrc"])
+
+    # Qrc file modified outside of update command
+    qrc = read_qrc("res.qrc")
+    qrc.add_file("resources/images/ghost.png", "/images")
+    qrc.remove_resource("resources/images/banner.png", "/images")
+    qrc.build()
+
+    runner.invoke(pyqtcli, ["update", "res.qrc"])
+
+    qrc = read_qrc("res.qrc")
+    assert "resources/images/ghost.png" not in qrc.list_resources("/images")
+    assert "resources/images/banner.png" in qrc.list_resources("/images")
+
+
+# noinspection PyUnusedLocal
+def test_update_leaves_up_to_date_files_untouched(config, test_resources):
+    runner = CliRunner()
+
+    runner.invoke(pyqtcli, ["new", "qrc", "res.qrc", "resources"])
+    runner.invoke(pyqtcli, ["update", "res.qrc"])
+    for path in ["res.qrc", "res_rc.py"]:
+        os.utime(path, (1, 1))
+
+    runner.invoke(pyqtcli, ["update", "res.qrc"])
+    assert os.stat("res.qrc").st_mtime == 1
+    assert os.stat("res_rc.py").st_mtime == 1
+
+    # A modified resource only requires the rc file to be generated
+    with open("resources/file.txt", "w") as f:
+        f.write("modified")
+
+    runner.invoke(pyqtcli, ["update", "res.qrc"])
+    assert os.stat("res.qrc").st_mtime == 1
+    assert os.stat("res_rc.py").st_mtime > 1
+
+
+def test_diff_resources():
+    added, removed = diff_resources(["a", "c", "d", "c"], ["d", "b", "a"])
+    assert added == ["c"]
+    assert removed == ["b"]
+
+
+# noinspection PyUnusedLocal
+def test_update_writes_qrc_once(config, test_resources, monkeypatch):
+    runner = CliRunner()
+    runner.invoke(pyqtcli, ["new", "qrc", "res.qrc", "resources"])
+
+    shutil.rmtree("resources/images")
+    shutil.rmtree("resources/musics")
+    open("resources/new.txt", "a").close()
+
+    builds = []
+    build = QRCFile.build
+    monkeypatch.setattr(QRCFile, "build",
+                        lambda self: builds.append(self.name) or build(self))
+
+    result = runner.invoke(pyqtcli, ["update", "res.qrc"])
+    assert result.exit_code == 0
+    assert builds == ["res.qrc"]
+
+    qrc = read_qrc("res.qrc")
+    assert [q.get("prefix") for q in qrc.qresources] == ["/"]
+    assert "resources/new.txt" in qrc.list_resources("/")
+
+
+# noinspection PyUnusedLocal
+def test_update_dry_run(config, test_resources):
+    runner = CliRunner()
+    runner.invoke(pyqtcli, ["new", "qrc", "res.qrc", "resources"])
+
+    shutil.rmtree("resources/images")
+    os.remove("resources/file.txt")
+    open("resources/new.txt", "a").close()
+
+    with open("res.qrc") as f:
+        qrc_content = f.read()
+    config_content = str(config)
+
+    result = runner.invoke(pyqtcli, ["update", "--dry-run", "res.qrc"])
+    assert result.exit_code == 0
+    assert format_msg(result.output) == (
+        "[INFO]: res.qrc would be updated: 1 resources folders removed, 1 "
+        "resources added and 1 removed\n")
+
+    result = runner.invoke(pyqtcli, ["update", "-n", "-v", "res.qrc"])
+    assert "resources/new.txt would be added" in result.output
+    assert "resources/file.txt would be removed" in result.output
+
+    with open("res.qrc") as f:
+        assert f.read() == qrc_content
+    assert str(config) == config_content
+    assert not os.path.isfile("res_rc.py")
+    assert not os.path.isfile(".pyqtclimanifest")
+
+
+# noinspection PyUnusedLocal
+def test_update_keeps_sorted_resources(config, test_resources):
+    config.cparser.set("project", "sort_resources", "yes")
+    config.save()
+
+    runner = CliRunner()
+    runner.invoke(pyqtcli, ["new", "qrc", "res.qrc", "resources"])
+
+    qrc = read_qrc("res.qrc")
+    assert [q.get("prefix") for q in qrc.qresources] == [
+        "/", "/images", "/musics"]
+    for prefix in ["/", "/images", "/musics"]:
+        resources = qrc.list_resources(prefix)
+        assert resources == sorted(resources)
+
+    open("resources/images/assets/aa.bmp", "a").close()
+    open("resources/images/zz.png", "a").close()
+    os.remove("resources/images/banner.png")
+    runner.invoke(pyqtcli, ["update", "res.qrc"])
+
+    resources = read_qrc("res.qrc").list_resources("/images")
+    assert "resources/images/assets/aa.bmp" in resources
+    assert "resources/images/banner.png" not in resources
+    assert resources == sorted(resources)
+
+
+# noinspection PyUnusedLocal
+def test_update_ignores_symlinked_directories(config, test_resources):
+    runner = CliRunner()
+    os.mkdir("other")
+    open("other/x.png", "a").close()
+    os.symlink("..", "resources/images/up")
+    os.symlink(os.path.abspath("other"), "resources/images/link")
+
+    runner.invoke(pyqtcli, ["new", "qrc", "res.qrc", "resources"])
+    resources = read_qrc("res.qrc").list_resources()
+
+    # Update agrees with new qrc on the content of the folder
+    result = runner.invoke(pyqtcli, ["update", "res.qrc"])
+    assert result.exit_code == 0
+    assert read_qrc("res.qrc").list_resources() == resources
+    assert "resources/images/link/x.png" not in resources
@@ -1,5 +1,11 @@
+import os
 import pytest
 
+from pyqtcli.utils import scan_files
+from pyqtcli.utils import IgnoreRules
+from pyqtcli.utils import DEFAULT_IGNORE
+from pyqtcli.utils import walk_tree
+from pyqtcli.utils import walk_directory
 from pyqtcli.utils import recursive_file_search
 
 
@@ -18,3 +24,94 @@ def test_search_files_in_nonexistent_directory():
     with pytest.raises(FileNotFoundError) as e:
         recursive_file_search("txt", "nonexistent")
     assert str(e.value) == "No such directory: 'nonexistent'"
+
+
+def _touch(path):
+    if os.path.dirname(path):
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+    open(path, "a").close()
+
+
+def test_search_skips_default_ignored_directories():
+    for path in ["res.qrc", "qrc/other.qrc", ".git/res.qrc",
+                 "node_modules/pkg/res.qrc", "venv/lib/res.qrc"]:
+        _touch(path)
+
+    ignore = IgnoreRules(DEFAULT_IGNORE)
+    assert sorted(recursive_file_search("qrc", ".", ignore)) == [
+        "./qrc/other.qrc", "./res.qrc"]
+
+
+def test_ignore_rules_of_project(config):
+    for path in ["res.qrc", "build/res.qrc", "build/keep/res.qrc",
+                 "gen/res.qrc", "src/gen/res.qrc", "tmp.qrc"]:
+        _touch(path)
+
+    with open(".gitignore", "w") as f:
+        f.write("# Build directory\nbuild/\n/gen/\ntmp.*\n")
+
+    config.cparser.set("project", "ignore", "\nsrc/gen")
+    config.save()
+
+    ignore = IgnoreRules.for_project(config.project)
+    assert sorted(recursive_file_search("qrc", ".", ignore)) == ["./res.qrc"]
+
+    # Re-include with a negated pattern
+    ignore.add("!tmp.qrc")
+    assert sorted(recursive_file_search("qrc", ".", ignore)) == [
+        "./res.qrc", "./tmp.qrc"]
+
+
+def test_ignore_rules_relative_to_base_path():
+    for path in ["dir/gen/res.qrc", "dir/sub/gen/res.qrc"]:
+        _touch(path)
+
+    os.chdir("dir")
+    ignore = IgnoreRules(["/dir/gen/"], "..")
+    assert list(scan_files("qrc", ".", ignore)) == ["./sub/gen/res.qrc"]
+
+
+def test_search_max_depth():
+    for path in ["res.qrc", "a/res.qrc", "a/b/res.qrc"]:
+        _touch(path)
+
+    assert list(scan_files("qrc", max_depth=0)) == ["./res.qrc"]
+    assert list(scan_files("qrc", max_depth=1)) == [
+        "./res.qrc", "./a/res.qrc"]
+
+
+def test_search_follows_symlinks_without_looping():
+    _touch("res/images/res.qrc")
+    os.symlink(os.path.abspath("res"), "res/images/loop")
+    os.symlink(os.path.abspath("res/images"), "images")
+
+    # Like os.walk, links aren't followed by default
+    assert list(scan_files("qrc")) == ["./res/images/res.qrc"]
+    assert recursive_file_search("qrc") == ["./res/images/res.qrc"]
+
+    # Files reached through several links are only found once
+    assert list(scan_files("qrc", follow_symlinks=True)) == [
+        "./images/res.qrc"]
+
+
+# noinspection PyUnusedLocal
+def test_walk_directory_in_parallel(test_resources):
+    os.symlink(os.path.abspath("resources/musics"), "resources/link")
+
+    assert walk_directory("resources", 4) == list(os.walk("resources"))
+    assert walk_directory("nonexistent", 4) == []
+
+
+# noinspection PyUnusedLocal
+def test_walk_tree_groups_subdirectories(test_resources):
+    os.symlink(os.path.abspath("resources/musics"), "resources/link")
+
+    for workers in (1, 4):
+        top_entry, walks = walk_tree("resources", workers)
+        assert top_entry == next(os.walk("resources"))
+        assert [name for name, _ in walks] == [
+            d for d in top_entry[1] if d != "link"]
+        for name, walk in walks:
+            assert walk == list(os.walk(os.path.join("resources", name)))
+
+    assert walk_tree("nonexistent") == (None, [])